@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
-from .core import CallbackResult, aioresponses
+from .core import CallbackResult, aioresponses, ring_buffer
 
 __version__ = '0.7.9'
 
 __all__ = [
     'CallbackResult',
     'aioresponses',
+    'ring_buffer',
 ]
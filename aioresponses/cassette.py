@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Recorded responses stored in a cassette file.
+
+A cassette is laid out as::
+
+    MAGIC
+    entry*        JSON metadata (status, reason, headers) followed by the body
+    index         JSON object {"METHOD url": [[meta offset, meta size,
+                                               body offset, body size], ...]}
+    trailer       index offset (8 bytes, big endian) and INDEX_MAGIC
+
+Replay maps the file into memory on first lookup and keeps nothing but
+the offset index, so opening a cassette costs the same however large its
+bodies are, and processes replaying the same cassette share its pages
+through the OS cache. Bodies larger than a read chunk are fed to responses
+straight from the mapping.
+"""
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .compat import URL
+from .streams import READ_LIMIT, MappedSlice
+
+MAGIC = b'AIORESPONSES CASSETTE 1\n'
+INDEX_MAGIC = b'AIORIDX\n'
+TRAILER = struct.Struct('>Q8s')
+
+# Response headers describing the transfer rather than the body; the
+# recorded body is already decoded, so its length may differ too.
+_TRANSFER_HEADERS = frozenset(
+    ('content-encoding', 'content-length', 'transfer-encoding')
+)
+
+CASSETTE_RECORD = 'record'
+CASSETTE_REPLAY = 'replay'
+# Replay the cassette if it exists, record it otherwise.
+CASSETTE_ONCE = 'once'
+CASSETTE_MODES = (CASSETTE_RECORD, CASSETTE_REPLAY, CASSETTE_ONCE)
+
+Recording = namedtuple('Recording', ['status', 'reason', 'headers', 'body'])
+
+IndexEntry = Tuple[int, int, int, int]
+
+
+class CassetteError(Exception):
+    """The file is not a cassette or it is damaged."""
+
+
+def index_key(method: str, url: URL) -> str:
+    return '%s %s' % (method.upper(), url)
+
+
+class CassetteWriter(object):
+    """Append recordings to a new cassette file."""
+
+    def __init__(self, path: 'Union[str, os.PathLike]'):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._index = {}  # type: Dict[str, List[IndexEntry]]
+
+    def add(self, method: str, url: URL, status: int, reason: Optional[str],
+            headers: Iterable[Tuple[str, str]], body: bytes) -> None:
+        headers = [
+            (name, value) for name, value in headers
+            if name.lower() not in _TRANSFER_HEADERS
+        ]
+        meta = json.dumps(
+            {'status': status, 'reason': reason, 'headers': headers},
+            separators=(',', ':'),
+        ).encode('utf8')
+        meta_offset = self._file.tell()
+        self._file.write(meta)
+        self._file.write(body)
+        self._index.setdefault(index_key(method, url), []).append(
+            (meta_offset, len(meta), meta_offset + len(meta), len(body))
+        )
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        self._file.write(
+            json.dumps(self._index, separators=(',', ':')).encode('utf8')
+        )
+        self._file.write(TRAILER.pack(index_offset, INDEX_MAGIC))
+        self._file.close()
+
+
+class Cassette(object):
+    """Read recordings back from a cassette file.
+
+    Every (method, url) replays its recordings in the order they were
+    recorded; the last one is replayed for any further request.
+    """
+
+    def __init__(self, path: 'Union[str, os.PathLike]'):
+        self.path = path
+        self._map = None  # type: Optional[mmap.mmap]
+        self._index = None  # type: Optional[Dict[str, List[IndexEntry]]]
+        self._replayed = {}  # type: Dict[str, int]
+
+    def _load_index(self) -> Dict[str, List[IndexEntry]]:
+        with open(self.path, 'rb') as fp:
+            size = os.fstat(fp.fileno()).st_size
+            if size < len(MAGIC) + TRAILER.size:
+                raise CassetteError('%s is not a cassette' % (self.path,))
+            # The mapping stays valid once the file object is closed.
+            mapping = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if mapping[:len(MAGIC)] != MAGIC:
+                raise CassetteError('%s is not a cassette' % (self.path,))
+            index_offset, magic = TRAILER.unpack(
+                mapping[size - TRAILER.size:]
+            )
+            if magic != INDEX_MAGIC:
+                raise CassetteError('%s has no index' % (self.path,))
+            index = json.loads(mapping[index_offset:size - TRAILER.size])
+        except BaseException:
+            mapping.close()
+            raise
+        self._map = mapping
+        return index
+
+    def _entries(self, method: str, url: URL) -> Optional[List[IndexEntry]]:
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index.get(index_key(method, url))
+
+    def __contains__(self, request: Tuple[str, URL]) -> bool:
+        return self._entries(*request) is not None
+
+    def _body(self, offset: int, size: int) -> 'Union[bytes, MappedSlice]':
+        if size <= READ_LIMIT:
+            return self._map[offset:offset + size]  # type: ignore[index]
+        return MappedSlice(self._map, offset, size)  # type: ignore[arg-type]
+
+    def replay(self, method: str, url: URL) -> Optional[Recording]:
+        """Return the next recording of method and url, if there is any."""
+        entries = self._entries(method, url)
+        if entries is None:
+            return None
+        key = index_key(method, url)
+        position = self._replayed.get(key, 0)
+        self._replayed[key] = position + 1
+        meta_offset, meta_size, body_offset, body_size = \
+            entries[min(position, len(entries) - 1)]
+        meta = json.loads(
+            self._map[meta_offset:meta_offset + meta_size]  # type: ignore
+        )
+        return Recording(
+            meta['status'], meta['reason'],
+            [tuple(header) for header in meta['headers']],
+            self._body(body_offset, body_size),
+        )
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._index = None
+        self._replayed.clear()
@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
-import asyncio  # noqa: F401
+import asyncio
+import re
 import sys
-from typing import Dict, Optional, Union  # noqa
+from collections import OrderedDict, namedtuple
+from typing import Any, Dict, Hashable, Optional, Union  # noqa
 from urllib.parse import parse_qsl, urlencode
 
-from aiohttp import __version__ as aiohttp_version, StreamReader
-from aiohttp.client_proto import ResponseHandler
+from aiohttp import __version__ as aiohttp_version, ClientTimeout, StreamReader
 from multidict import MultiDict
 from packaging.version import Version
 from yarl import URL
@@ -18,30 +19,202 @@ else:
 AIOHTTP_VERSION = Version(aiohttp_version)
 
 
+class StreamProtocol(object):
+    """The part of aiohttp's BaseProtocol a StreamReader relies on.
+
+    Mocked responses have no transport, so the full ResponseHandler is not
+    needed to back their content.
+    """
+    __slots__ = ('_reading_paused',)
+
+    connected = False
+
+    def __init__(self) -> None:
+        self._reading_paused = False
+
+    def pause_reading(self) -> None:
+        self._reading_paused = True
+
+    def resume_reading(self) -> None:
+        self._reading_paused = False
+
+
+class DetachedLoop(object):
+    """Loop stand-in for responses built outside of a running event loop."""
+    __slots__ = ()
+
+    def get_debug(self) -> bool:
+        return False
+
+    def is_closed(self) -> bool:
+        return True
+
+
+def get_response_loop() -> 'asyncio.AbstractEventLoop':
+    """Return the running loop or a stand-in when there is none."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return DetachedLoop()  # type: ignore[return-value]
+
+
 def stream_reader_factory(  # noqa
     loop: 'Optional[asyncio.AbstractEventLoop]' = None
 ) -> StreamReader:
-    protocol = ResponseHandler(loop=loop)
-    return StreamReader(protocol, limit=2 ** 16, loop=loop)
+    if loop is None:
+        loop = get_response_loop()
+    return StreamReader(StreamProtocol(), limit=2 ** 16, loop=loop)
+
+
+def request_timeout(session: Any, kwargs: Dict) -> Optional[ClientTimeout]:
+    """Return the timeout aiohttp applies to a request made with kwargs."""
+    if 'timeout' not in kwargs:
+        return getattr(session, '_timeout', None)
+    timeout = kwargs['timeout']
+    if isinstance(timeout, ClientTimeout):
+        return timeout
+    return ClientTimeout(total=timeout)
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# Urls normalized or merged with params are kept for this many inputs.
+URL_CACHE_SIZE = 1024
+
+_MISSING = object()
+
+
+class LRUCache(object):
+    """Bounded mapping dropping the least recently used entries first."""
+
+    def __init__(self, maxsize: int = URL_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # type: OrderedDict
+
+    def get(self, key: Hashable) -> Any:
+        """Return the value of key, or _MISSING if it is not cached."""
+        try:
+            value = self._data[key]
+            self._data.move_to_end(key)
+        except KeyError:
+            self.misses += 1
+            return _MISSING
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        """Change the number of entries kept, 0 disables the cache."""
+        self.maxsize = maxsize
+        while len(self._data) > max(maxsize, 0):
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+
+# Shared by merge_params() and normalize_url(); mocked clients usually
+# request a few urls over and over.
+url_cache = LRUCache()
+
+
+def _params_key(params: Any) -> Optional[Hashable]:
+    """Return a hashable stand-in for params, None if there is none.
+
+    Values are keyed with their type, as 1 and 1.0 end up as different
+    query strings.
+    """
+    if isinstance(params, str):
+        return params
+    if hasattr(params, 'items'):
+        params = params.items()
+    elif not isinstance(params, (list, tuple)):
+        return None
+    key = tuple((name, type(value), value) for name, value in params)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
 
 
 def merge_params(
     url: 'Union[URL, str]',
     params: Optional[Dict] = None
 ) -> 'URL':
+    if not params:
+        return URL(url)
+    key = _params_key(params)
+    if key is not None:
+        key = ('merge', url, key)
+        merged = url_cache.get(key)
+        if merged is not _MISSING:
+            return merged
     url = URL(url)
-    if params:
-        query_params = MultiDict(url.query)
-        query_params.extend(url.with_query(params).query)
-        return url.with_query(query_params)
-    return url
+    query_params = MultiDict(url.query)
+    query_params.extend(url.with_query(params).query)
+    merged = url.with_query(query_params)
+    if key is not None:
+        url_cache.put(key, merged)
+    return merged
 
 
-def normalize_url(url: 'Union[URL, str]') -> 'URL':
-    """Normalize url to make comparisons."""
-    url = URL(url)
-    return url.with_query(urlencode(sorted(parse_qsl(url.query_string))))
+# Query strings of name=value pairs that parse_qsl() and urlencode() leave
+# as they are.
+_PLAIN_QUERY = re.compile(
+    r'[\w.~-]+=[\w.~-]+(?:&[\w.~-]+=[\w.~-]+)*\Z', re.ASCII
+)
+
 
+def normalize_url(url: 'Union[URL, str]', cached: bool = True) -> 'URL':
+    """Normalize url to make comparisons.
+
+    Callers normalizing many distinct urls once pass cached=False, which
+    keeps them from pushing the urls of requests out of the cache.
+    """
+    if cached:
+        key = ('normalize', url)
+        normalized = url_cache.get(key)
+        if normalized is not _MISSING:
+            return normalized
+    normalized = URL(url)
+    query_string = normalized.query_string
+    # Rebuilding an empty query string would leave the url as it is.
+    if query_string:
+        if _PLAIN_QUERY.match(query_string):
+            if '&' in query_string:
+                pairs = sorted(
+                    pair.split('=') for pair in query_string.split('&')
+                )
+                query = '&'.join(map('='.join, pairs))
+                if query != query_string:
+                    normalized = normalized.with_query(query)
+        else:
+            normalized = normalized.with_query(
+                urlencode(sorted(parse_qsl(query_string)))
+            )
+    if cached:
+        url_cache.put(key, normalized)
+    return normalized
+
+
+try:
+    from aiohttp import ConnectionTimeoutError, SocketTimeoutError
+except ImportError:  # aiohttp < 3.10
+    from aiohttp import ServerTimeoutError as ConnectionTimeoutError
+    from aiohttp import ServerTimeoutError as SocketTimeoutError
 
 try:
     from aiohttp import RequestInfo
@@ -61,8 +234,16 @@ __all__ = [
     'URL',
     'Pattern',
     'RequestInfo',
+    'ConnectionTimeoutError',
+    'SocketTimeoutError',
     'AIOHTTP_VERSION',
+    'CacheInfo',
+    'LRUCache',
+    'URL_CACHE_SIZE',
+    'get_response_loop',
     'merge_params',
+    'request_timeout',
     'stream_reader_factory',
     'normalize_url',
+    'url_cache',
 ]
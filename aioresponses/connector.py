@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Mock responses below aiohttp's client, see :meth:`aioresponses.connector`.
+
+Requests of a session using :class:`MockConnector` are not intercepted in
+``ClientSession._request`` but run through the whole client: request
+preparation, compression, the connector's pool limits, cookie updates,
+the HTTP parser, automatic decompression and ``read_bufsize``. Only the
+socket is replaced; the matched response is serialized to HTTP/1.1 and
+fed to aiohttp's own response protocol, so the time spent by the client
+shows up in profiles as it would in production.
+"""
+import asyncio
+from typing import TYPE_CHECKING, Any, Dict, List, Set
+
+from aiohttp import BaseConnector, ClientConnectionError, hdrs
+from aiohttp.client_proto import ResponseHandler
+
+from .compat import normalize_url
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .core import aioresponses
+
+# Headers of a mocked response describing the transfer, which is chunked
+# and closes the connection once done.
+_TRANSFER_HEADERS = frozenset(
+    (b'content-length', b'transfer-encoding', b'connection')
+)
+_TRANSFER = b'Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n'
+
+
+class _MockTransport(asyncio.Transport):
+    """Transport of a mocked connection, discarding what is written."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop,
+                 protocol: ResponseHandler):
+        super().__init__()
+        self._loop = loop
+        self._protocol = protocol
+        self._closing = False
+        self._reading = asyncio.Event()
+        self._reading.set()
+        # Bytes of the request written by the client.
+        self.written = 0
+
+    def write(self, data: Any) -> None:
+        self.written += len(data)
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def close(self) -> None:
+        if not self._closing:
+            self._closing = True
+            self._reading.set()
+            self._loop.call_soon(
+                self._protocol.connection_lost, None
+            )
+
+    def abort(self) -> None:
+        self.close()
+
+    def pause_reading(self) -> None:
+        self._reading.clear()
+
+    def resume_reading(self) -> None:
+        self._reading.set()
+
+    def is_reading(self) -> bool:
+        return self._reading.is_set()
+
+    async def reading(self) -> None:
+        """Wait until the client wants to receive more data."""
+        await self._reading.wait()
+
+
+def _serialize_head(response: Any) -> bytes:
+    lines = [b'HTTP/1.1 %d %s\r\n' % (
+        response.status, (response.reason or '').encode('latin-1')
+    )]
+    for name, value in response.raw_headers:
+        if name.lower() not in _TRANSFER_HEADERS:
+            lines.append(b'%s: %s\r\n' % (name, value))
+    lines.append(_TRANSFER)
+    return b''.join(lines)
+
+
+class MockConnector(BaseConnector):
+    """Connector answering requests with the routes of a mock.
+
+    Every request gets a connection of its own, closed after the
+    response; the ``limit`` and ``limit_per_host`` of the connector are
+    enforced by aiohttp as usual. The mock has to be active while the
+    connector is used.
+    """
+
+    def __init__(self, mocked: 'aioresponses', **kwargs: Any):
+        kwargs['force_close'] = True
+        super().__init__(**kwargs)
+        self.mocked = mocked
+        self._responders: Set['asyncio.Task[None]'] = set()
+
+    async def _create_connection(self, req: Any, traces: List[Any],
+                                 timeout: Any) -> ResponseHandler:
+        protocol = ResponseHandler(self._loop)
+        transport = _MockTransport(self._loop, protocol)
+        protocol.connection_made(transport)
+        task = self._loop.create_task(self._respond(req, protocol, transport))
+        self._responders.add(task)
+        task.add_done_callback(self._responders.discard)
+        return protocol
+
+    async def _respond(self, req: Any, protocol: ResponseHandler,
+                       transport: _MockTransport) -> None:
+        method = req.method
+        url = normalize_url(req.url)
+        kwargs: Dict[str, Any] = {'headers': req.headers}
+        # Bytes bodies are passed on as such, other payloads as they are.
+        data = getattr(req.body, '_value', req.body)
+        if data:
+            kwargs['data'] = data
+        self.mocked._record_request(method, url, **kwargs)
+        try:
+            response = await self.mocked.match(
+                method, url, allow_redirects=False, **kwargs
+            )
+            if response is None:
+                raise ClientConnectionError(
+                    'Connection refused: {} {}'.format(method, url)
+                )
+        except Exception as exc:
+            protocol.set_exception(exc)
+            return
+        try:
+            # Anything fed before the client is ready to parse the
+            # response is kept by the protocol until it is.
+            protocol.data_received(_serialize_head(response))
+            if method != hdrs.METH_HEAD:
+                async for chunk in response.content.iter_any():
+                    await transport.reading()
+                    if transport.is_closing():
+                        return
+                    protocol.data_received(
+                        b'%x\r\n%s\r\n' % (len(chunk), chunk)
+                    )
+                protocol.data_received(b'0\r\n\r\n')
+        finally:
+            response.release()
+
+    def close(self) -> Any:
+        for task in self._responders:
+            task.cancel()
+        return super().close()
@@ -1,58 +1,100 @@
 # -*- coding: utf-8 -*-
 import asyncio
 import copy
+import heapq
 import inspect
 import json
-from collections import namedtuple
-from functools import wraps
+import os
+import re
+from collections import abc, deque, namedtuple
+from functools import partial, wraps
+from itertools import chain, count
+from operator import itemgetter
+from time import perf_counter
 from typing import (
     Any,
     Callable,
     cast,
+    Deque,
     Dict,
+    Generic,
+    Iterable,
     List,
+    Mapping,
     Optional,
+    Sequence,
     Tuple,
     Type,
     TypeVar,
     Union,
 )
-from unittest.mock import Mock, patch
-from uuid import uuid4
+import weakref
+from weakref import WeakSet
 
 from aiohttp import (
     ClientConnectionError,
     ClientResponse,
     ClientSession,
+    ClientTimeout,
     hdrs,
     http
 )
 from aiohttp.helpers import TimerNoop
+from aiohttp.tracing import Trace
 from multidict import CIMultiDict, CIMultiDictProxy
 from packaging.version import Version
 
 from .compat import (
     URL,
+    ConnectionTimeoutError,
     Pattern,
+    SocketTimeoutError,
+    get_response_loop,
     stream_reader_factory,
     merge_params,
     normalize_url,
+    request_timeout,
     RequestInfo, AIOHTTP_VERSION,
 )
+from .cassette import (
+    CASSETTE_MODES,
+    CASSETTE_ONCE,
+    CASSETTE_RECORD,
+    Cassette,
+    CassetteWriter,
+    Recording,
+)
+from .connector import MockConnector
+from .har import iter_routes
+from .latency import Latency, VirtualClock, as_latency
+from .passthrough import PassthroughRules
+from .pool import ConnectionPools, PoolStats
+from .server import MockServer
+from .stats import RouteStats, StatsSnapshot, snapshot
+from .streams import (
+    MappedFile,
+    StreamingBody,
+    is_streaming_body,
+    on_body_done,
+    stream_body,
+    throttled_reader,
+)
 
 _FuncT = TypeVar("_FuncT", bound=Callable[..., Any])
+_EntryT = TypeVar("_EntryT")
 
 
 class CallbackResult:
 
     def __init__(self, method: str = hdrs.METH_GET,
                  status: int = 200,
-                 body: Union[str, bytes] = '',
+                 body: 'Union[str, bytes, StreamingBody]' = '',
                  content_type: str = 'application/json',
                  payload: Optional[Dict] = None,
                  headers: Optional[Dict] = None,
                  response_class: Optional[Type[ClientResponse]] = None,
-                 reason: Optional[str] = None):
+                 reason: Optional[str] = None,
+                 body_file: 'Optional[Union[str, os.PathLike]]' = None):
         self.method = method
         self.status = status
         self.body = body
@@ -61,15 +103,28 @@ class CallbackResult:
         self.headers = headers
         self.response_class = response_class
         self.reason = reason
+        self.body_file = body_file
+
+
+ResponseTemplate = namedtuple(
+    'ResponseTemplate', ['body', 'headers', 'raw_headers', 'cookies']
+)
+ResponseHeaders = namedtuple(
+    'ResponseHeaders', ['headers', 'raw_headers', 'cookies']
+)
 
 
 class RequestMatch(object):
     url_or_pattern = None  # type: Union[URL, Pattern]
+    # Encoded body and headers of the mocked response, built on first use.
+    _template = None  # type: Optional[ResponseTemplate]
+    # Header objects shared with other matches, see aioresponses.add_many().
+    _shared_headers = None  # type: Optional[ResponseHeaders]
 
     def __init__(self, url: Union[URL, str, Pattern],
                  method: str = hdrs.METH_GET,
                  status: int = 200,
-                 body: Union[str, bytes] = '',
+                 body: 'Union[str, bytes, StreamingBody]' = '',
                  payload: Optional[Dict] = None,
                  exception: Optional[Exception] = None,
                  headers: Optional[Dict] = None,
@@ -78,18 +133,25 @@ class RequestMatch(object):
                  timeout: bool = False,
                  repeat: Union[bool, int] = False,
                  reason: Optional[str] = None,
-                 callback: Optional[Callable] = None):
+                 callback: Optional[Callable] = None,
+                 body_file: 'Optional[Union[str, os.PathLike]]' = None,
+                 latency: 'Union[None, float, Latency]' = None,
+                 bandwidth: Optional[float] = None,
+                 connect_latency: 'Union[None, float, Latency]' = None,
+                 normalize: bool = True):
         if isinstance(url, Pattern):
             self.url_or_pattern = url
             self.match_func = self.match_regexp
         else:
-            self.url_or_pattern = normalize_url(url)
+            # Callers registering many routes normalize every url once.
+            self.url_or_pattern = normalize_url(url) if normalize else url
             self.match_func = self.match_str
         self.method = method.lower()
         self.status = status
         self.body = body
         self.payload = payload
         self.exception = exception
+        self.timeout = timeout
         if timeout:
             self.exception = asyncio.TimeoutError('Connection timeout test')
         self.headers = headers
@@ -103,6 +165,25 @@ class RequestMatch(object):
             except (IndexError, KeyError):
                 self.reason = ''
         self.callback = callback
+        self.body_file = body_file
+        self.stats = RouteStats(self.method, self.url_or_pattern)
+        self.latency = as_latency(latency)
+        self.connect_latency = as_latency(connect_latency)
+        if bandwidth is not None and bandwidth <= 0:
+            raise ValueError('Bandwidth must be positive, got %r' % bandwidth)
+        self.bandwidth = bandwidth
+
+    def sample_latency(self) -> float:
+        """Return the simulated server delay of the next response."""
+        if self.latency is None:
+            return 0.0
+        return self.latency.sample()
+
+    def sample_connect_latency(self) -> float:
+        """Return the simulated time to connect for the next response."""
+        if self.connect_latency is None:
+            return 0.0
+        return self.connect_latency.sample()
 
     def match_str(self, url: URL) -> bool:
         return self.url_or_pattern == url
@@ -129,27 +210,60 @@ class RequestMatch(object):
             raw_headers.append((k.encode('utf8'), v.encode('utf8')))
         return tuple(raw_headers)
 
+    def _build_template(self, body: 'Union[str, bytes, StreamingBody]' = '',
+                        content_type: str = 'application/json',
+                        payload: Optional[Dict] = None,
+                        headers: Optional[Dict] = None,
+                        body_file: 'Optional[Union[str, os.PathLike]]' = None,
+                        shared_headers: Optional[ResponseHeaders] = None
+                        ) -> ResponseTemplate:
+        """Encode the parts of a response which do not depend on a request."""
+        if payload is not None:
+            body = json.dumps(payload)
+        elif body_file is not None:
+            body = MappedFile(body_file)
+        if isinstance(body, str):
+            body = str.encode(body)
+        elif not is_streaming_body(body):
+            body = bytes(body)
+        if shared_headers is None:
+            shared_headers = self._build_headers(content_type, headers)
+        return ResponseTemplate(body, *shared_headers)
+
+    def _build_headers(self, content_type: str = 'application/json',
+                       headers: Optional[Dict] = None) -> ResponseHeaders:
+        """Build the read-only header objects of a response."""
+        _headers = CIMultiDict({hdrs.CONTENT_TYPE: content_type})
+        if headers:
+            _headers.update(headers)
+        return ResponseHeaders(
+            headers=CIMultiDictProxy(_headers),
+            raw_headers=self._build_raw_headers(_headers),
+            cookies=tuple(_headers.getall(hdrs.SET_COOKIE, ())),
+        )
+
     def _build_response(self, url: 'Union[URL, str]',
                         method: str = hdrs.METH_GET,
                         request_headers: Optional[Dict] = None,
                         status: int = 200,
-                        body: Union[str, bytes] = '',
+                        body: 'Union[str, bytes, StreamingBody]' = '',
                         content_type: str = 'application/json',
                         payload: Optional[Dict] = None,
                         headers: Optional[Dict] = None,
                         response_class: Optional[Type[ClientResponse]] = None,
-                        reason: Optional[str] = None) -> ClientResponse:
+                        reason: Optional[str] = None,
+                        template: Optional[ResponseTemplate] = None,
+                        body_file: 'Optional[Union[str, os.PathLike]]' = None
+                        ) -> ClientResponse:
         if response_class is None:
             response_class = ClientResponse
-        if payload is not None:
-            body = json.dumps(payload)
-        if not isinstance(body, bytes):
-            body = str.encode(body)
+        if template is None:
+            template = self._build_template(
+                body, content_type, payload, headers, body_file
+            )
         if request_headers is None:
             request_headers = {}
-        loop = Mock()
-        loop.get_debug = Mock()
-        loop.get_debug.return_value = True
+        loop = get_response_loop()
         kwargs = {}  # type: Dict[str, Any]
         kwargs['request_info'] = RequestInfo(
             url=url,
@@ -164,42 +278,52 @@ class RequestMatch(object):
         kwargs['loop'] = loop
         kwargs['session'] = None
 
-        # We need to initialize headers manually
-        _headers = CIMultiDict({hdrs.CONTENT_TYPE: content_type})
-        if headers:
-            _headers.update(headers)
-        raw_headers = self._build_raw_headers(_headers)
         resp = response_class(method, url, **kwargs)
 
-        for hdr in _headers.getall(hdrs.SET_COOKIE, ()):
+        for hdr in template.cookies:
             resp.cookies.load(hdr)
 
         # Reified attributes
-        resp._headers = _headers
-        resp._raw_headers = raw_headers
+        resp._headers = template.headers
+        resp._raw_headers = template.raw_headers
 
         resp.status = status
         resp.reason = reason
-        resp.content = stream_reader_factory(loop)
-        resp.content.feed_data(body)
-        resp.content.feed_eof()
+        if isinstance(template.body, bytes):
+            resp.content = stream_reader_factory(loop)
+            resp.content.feed_data(template.body)
+            resp.content.feed_eof()
+        else:
+            resp.content = stream_body(template.body, loop=loop)
         return resp
 
     async def build_response(
         self, url: URL, **kwargs: Any
     ) -> 'Union[ClientResponse, Exception]':
         if callable(self.callback):
+            started = perf_counter()
             if asyncio.iscoroutinefunction(self.callback):
                 result = await self.callback(url, **kwargs)
             else:
                 result = self.callback(url, **kwargs)
+            self.stats.callback.add(perf_counter() - started)
         else:
             result = None
 
         if self.exception is not None:
             return self.exception
 
-        result = self if result is None else result
+        started = perf_counter()
+        if result is None:
+            result = self
+            if self._template is None:
+                self._template = self._build_template(
+                    self.body, self.content_type, self.payload, self.headers,
+                    self.body_file, self._shared_headers
+                )
+            template = self._template
+        else:
+            template = None
         resp = self._build_response(
             url=url,
             method=result.method,
@@ -210,30 +334,368 @@ class RequestMatch(object):
             payload=result.payload,
             headers=result.headers,
             response_class=result.response_class,
-            reason=result.reason)
+            reason=result.reason,
+            template=template,
+            body_file=result.body_file)
+        self.stats.build.add(perf_counter() - started)
         return resp
 
+    @classmethod
+    def from_recording(cls, url: URL, method: str,
+                       recording: Recording) -> 'RequestMatch':
+        """Return a match replaying a recorded response as it was."""
+        matcher = cls(url, method=method, status=recording.status,
+                      reason=recording.reason, repeat=True)
+        headers = CIMultiDict(recording.headers)
+        matcher._template = ResponseTemplate(
+            body=recording.body,
+            headers=CIMultiDictProxy(headers),
+            raw_headers=matcher._build_raw_headers(headers),
+            cookies=tuple(headers.getall(hdrs.SET_COOKIE, ())),
+        )
+        return matcher
+
     def __repr__(self) -> str:
         return f"RequestMatch('{self.url_or_pattern}')"
 
 
+class PatternDispatcher(Generic[_EntryT]):
+    """Find the earliest registered pattern matching an url.
+
+    Patterns are indexed by their literal prefix, the text any url they
+    match starts with, in a character trie. One walk along the url collects
+    the patterns whose prefix it starts with; only those are tried, in
+    registration order. Patterns without a usable prefix (alternations,
+    case insensitive ones, ...) are tried for every url.
+
+    Entries the caller has removed since are skipped by ``find`` and
+    dropped once they reach the front of their list.
+    """
+    # Key of a trie node holding the patterns whose prefix ends there.
+    _END = ''
+    _METACHARACTERS = frozenset('.^$*+?{}[]|()')
+    _OPTIONAL = frozenset('*?{')
+    # Up to this many candidates, sorting a copy is cheaper than merging.
+    _SORT_LIMIT = 32
+
+    def __init__(self, entries: Iterable[Tuple[_EntryT, Pattern]] = ()):
+        self._trie = {}  # type: Dict[str, Any]
+        self._positions = count()
+        for entry, pattern in entries:
+            self.add(entry, pattern)
+
+    def add(self, entry: _EntryT, pattern: Pattern) -> None:
+        """Add a pattern after all patterns added so far."""
+        node = self._trie
+        for char in self.literal_prefix(pattern):
+            node = node.setdefault(char, {})
+        node.setdefault(self._END, deque()).append(
+            (next(self._positions), entry, pattern)
+        )
+
+    @classmethod
+    def literal_prefix(cls, pattern: Pattern) -> str:
+        """Return the text all strings matched by pattern start with."""
+        source = pattern.pattern
+        if not isinstance(source, str) \
+                or pattern.flags & (re.IGNORECASE | re.VERBOSE) \
+                or cls._has_alternation(source):
+            return ''
+        prefix = []
+        position = 1 if source.startswith('^') else 0
+        while position < len(source):
+            char = source[position]
+            if char == '\\':
+                char = source[position + 1:position + 2]
+                # \d, \w, \A, \1, ... are no literals.
+                if not char or char.isalnum():
+                    break
+                step = 2
+            elif char in cls._METACHARACTERS:
+                break
+            else:
+                step = 1
+            position += step
+            quantifier = source[position:position + 1]
+            if quantifier in cls._OPTIONAL:
+                break
+            prefix.append(char)
+            if quantifier == '+':
+                break
+        return ''.join(prefix)
+
+    @staticmethod
+    def _has_alternation(source: str) -> bool:
+        """Tell if source has a ``|`` outside of groups and classes."""
+        depth = 0
+        in_class = False
+        position = 0
+        while position < len(source):
+            char = source[position]
+            if char == '\\':
+                position += 1
+            elif in_class:
+                in_class = char != ']'
+            elif char == '[':
+                in_class = True
+                # A ']' right after the opening bracket is a literal.
+                if source.startswith('^', position + 1):
+                    position += 1
+                if source.startswith(']', position + 1):
+                    position += 1
+            elif char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif char == '|' and depth == 0:
+                return True
+            position += 1
+        return False
+
+    def find(self, url: str,
+             alive: Optional[Callable[[_EntryT], bool]] = None
+             ) -> Optional[_EntryT]:
+        """Return the earliest entry whose pattern matches url.
+
+        Entries for which alive returns False are left out.
+        """
+        node = self._trie
+        candidates = []  # type: List[Deque[Tuple[int, _EntryT, Pattern]]]
+        if self._END in node:
+            candidates.append(node[self._END])
+        for char in url:
+            node = node.get(char)
+            if node is None:
+                break
+            if self._END in node:
+                candidates.append(node[self._END])
+        if alive is not None:
+            for entries in candidates:
+                # One-shot routes are consumed in about the order they
+                # were added.
+                while entries and not alive(entries[0][1]):
+                    entries.popleft()
+        if len(candidates) == 1:
+            ordered = candidates[0]  # type: Iterable[Tuple[int, _EntryT, Pattern]]  # noqa
+        elif sum(map(len, candidates)) <= self._SORT_LIMIT:
+            ordered = sorted(chain.from_iterable(candidates))
+        else:
+            # Every list is in the order its entries were added.
+            ordered = heapq.merge(*candidates)
+        for _, entry, pattern in ordered:
+            if (alive is None or alive(entry)) and pattern.match(url):
+                return entry
+        return None
+
+
 RequestCall = namedtuple('RequestCall', ['args', 'kwargs'])
 
+RingBuffer = namedtuple('RingBuffer', ['size'])
+
+
+def _release_nothing() -> None:
+    pass
+
+
+class RequestContext(object):
+    """State of a mocked request, shared by all of its redirects."""
+    __slots__ = (
+        'session', 'timeout', 'elapsed', 'traces', 'headers', 'started',
+        'method', 'url',
+    )
+
+    def __init__(self, session: Optional[ClientSession] = None,
+                 timeout: Optional[ClientTimeout] = None,
+                 traces: Optional[List[Trace]] = None,
+                 headers: Optional[Dict] = None):
+        self.session = session
+        self.timeout = timeout
+        # Simulated time spent on the request so far.
+        self.elapsed = 0.0
+        self.traces = traces or []
+        # Only needed for the trace signals.
+        self.headers = CIMultiDict(headers or {}) if self.traces else None
+        self.started = False
+        # Method and url of the current hop of a redirect chain.
+        self.method = None  # type: Optional[str]
+        self.url = None  # type: Optional[URL]
+
+    @staticmethod
+    def create_traces(session: ClientSession,
+                      trace_request_ctx: Any = None) -> List[Trace]:
+        """Return the traces of the session's trace configs, like aiohttp."""
+        return [
+            Trace(
+                session, trace_config,
+                trace_config.trace_config_ctx(
+                    trace_request_ctx=trace_request_ctx
+                ),
+            )
+            for trace_config in getattr(session, '_trace_configs', ())
+        ]
+
+    async def trace_start(self) -> None:
+        """Send on_request_start, once the request is known to be mocked."""
+        if self.started:
+            return
+        self.started = True
+        for trace in self.traces:
+            await trace.send_request_start(self.method, self.url, self.headers)
+
+    async def trace_redirect(self, response: ClientResponse) -> None:
+        for trace in self.traces:
+            await trace.send_request_redirect(
+                self.method, self.url, self.headers, response
+            )
+
+    async def trace_end(self, response: ClientResponse) -> None:
+        for trace in self.traces:
+            await trace.send_request_end(
+                self.method, self.url, self.headers, response
+            )
+
+    async def trace_exception(self, exception: BaseException) -> None:
+        for trace in self.traces:
+            await trace.send_request_exception(
+                self.method, self.url, self.headers, exception
+            )
+
+    def remaining(self) -> Optional[float]:
+        """Return the time left before the total timeout, if there is one."""
+        if self.timeout is None or not self.timeout.total:
+            return None
+        return self.timeout.total - self.elapsed
+
+    def connect_timeout(self) -> Optional[float]:
+        """Return the time allowed to connect, if limited."""
+        if self.timeout is None:
+            return None
+        limits = [
+            limit for limit in (self.timeout.connect,
+                                self.timeout.sock_connect)
+            if limit
+        ]
+        return min(limits) if limits else None
+
+    def read_timeout(self) -> Optional[float]:
+        """Return the time allowed to wait for data, if limited."""
+        if self.timeout is None:
+            return None
+        return self.timeout.sock_read or None
+
+
+RECORDING_FULL = 'full'
+RECORDING_SHALLOW = 'shallow'
+RECORDING_COUNTS_ONLY = 'counts_only'
+RECORDING_OFF = 'off'
+RECORDING_MODES = (
+    RECORDING_FULL,
+    RECORDING_SHALLOW,
+    RECORDING_COUNTS_ONLY,
+    RECORDING_OFF,
+)
+
+
+def ring_buffer(size: int) -> RingBuffer:
+    """Recording mode keeping (shallow copies of) the last size requests."""
+    if size < 1:
+        raise ValueError('Ring buffer size must be positive, got %r' % size)
+    return RingBuffer(size)
+
+
+# Started aioresponses instances, the most recently started one is in charge.
+_active_mocks = []  # type: List[aioresponses]
+# ClientSession._request as it was before the patch got installed.
+_original_request = None  # type: Optional[Callable[..., Any]]
+
+
+async def _patched_request(orig_self: ClientSession,
+                           method: str, url: 'Union[URL, str]',
+                           *args: Any, **kwargs: Any) -> ClientResponse:
+    """Replacement of ClientSession._request installed once per process."""
+    if not _active_mocks:
+        return await _original_request(  # type: ignore[misc]
+            orig_self, method, url, *args, **kwargs
+        )
+    return await _active_mocks[-1]._request_mock(
+        orig_self, method, url, *args, **kwargs
+    )
+
+
+def _install_patch() -> None:
+    """Patch ClientSession._request unless it is patched already.
+
+    Installing the patch is cheap and it stays in place, so starting and
+    stopping a mock only has to push to and pop from _active_mocks. If
+    somebody else replaced ClientSession._request in the meantime, their
+    version becomes the original one.
+    """
+    global _original_request
+    if ClientSession._request is not _patched_request:
+        _original_request = ClientSession._request
+        ClientSession._request = _patched_request  # type: ignore
+
 
 class aioresponses(object):
     """Mock aiohttp requests made by ClientSession."""
-    _matches = None  # type: Dict[str, RequestMatch]
-    _responses: List[ClientResponse] = None
+    # Matchers keyed by their registration sequence number, so comparing
+    # keys tells which matcher was registered first.
+    _matches = None  # type: Dict[int, RequestMatch]
+    # Plain url matches indexed by (method, normalized url). Every bucket
+    # holds keys in registration order.
+    _matches_index = None  # type: Dict[Tuple[str, URL], Deque[int]]
+    # Keys of pattern based matches in registration order.
+    _regexp_matches = None  # type: List[int]
+    # Compiled lazily per method, dropped whenever a pattern is added.
+    _regexp_dispatchers = None  # type: Dict[str, PatternDispatcher]
+    # Responses still referenced by the code under test, closed on stop().
+    _responses: 'WeakSet[ClientResponse]' = None
     requests = None  # type: Dict
 
     def __init__(self, **kwargs: Any):
         self._param = kwargs.pop('param', None)
-        self._passthrough = kwargs.pop('passthrough', [])
+        # Url prefixes or patterns, and hosts, of requests made for real.
+        self._passthrough = PassthroughRules(
+            kwargs.pop('passthrough', ()),
+            kwargs.pop('passthrough_hosts', ()),
+        )
         self.passthrough_unmatched = kwargs.pop('passthrough_unmatched', False)
-        self.patcher = patch('aiohttp.client.ClientSession._request',
-                             side_effect=self._request_mock,
-                             autospec=True)
+        # Hand unmatched requests to the mock started before this one.
+        self.fallthrough = kwargs.pop('fallthrough', False)
+        recording = kwargs.pop('recording', RECORDING_FULL)
+        if not isinstance(recording, RingBuffer) \
+                and recording not in RECORDING_MODES:
+            raise ValueError('Unknown recording mode: %r' % (recording,))
+        self._recording = recording
+        # Number of calls per (method, url), kept unless recording is off.
+        self._call_counts = {}  # type: Dict[Tuple[str, URL], int]
+        self._call_count = 0
+        # Keys of the recorded calls in order, used by the ring buffer.
+        self._recorded_keys = deque()  # type: Deque[Tuple[str, URL]]
         self.requests = {}
+        self._sequence = count()
+        # Kept after stop(), so they can be looked at once the mock is done.
+        # Stats of removed routes are summed up per method and url, which
+        # keeps them from growing with every route a long test adds.
+        self._retired_stats = {}  # type: Dict[Tuple[str, Any], Tuple[int, RouteStats]]  # noqa
+        self._unmatched = {}  # type: Dict[Tuple[str, URL], int]
+        # Simulated delays advance this clock instead of taking wall time.
+        self.clock = None  # type: Optional[VirtualClock]
+        if kwargs.pop('virtual_time', False):
+            self.clock = VirtualClock()
+        # Enforce the limits of the session connector on mocked requests.
+        self._pools = None  # type: Optional[ConnectionPools]
+        if kwargs.pop('pool_limits', False):
+            self._pools = ConnectionPools()
+        # Record passed through responses to, or replay them from a file.
+        self.cassette_path = kwargs.pop('cassette', None)
+        self.cassette_mode = kwargs.pop('cassette_mode', CASSETTE_ONCE)
+        if self.cassette_mode not in CASSETTE_MODES:
+            raise ValueError(
+                'Unknown cassette mode: %r' % (self.cassette_mode,)
+            )
+        self._cassette = None  # type: Optional[Cassette]
+        self._cassette_writer = None  # type: Optional[CassetteWriter]
 
     def __enter__(self) -> 'aioresponses':
         self.start()
@@ -266,19 +728,63 @@ class aioresponses(object):
 
     def clear(self) -> None:
         self._responses.clear()
+        for key, matcher in self._matches.items():
+            self._retire_stats(key, matcher)
         self._matches.clear()
+        self._matches_index.clear()
+        self._regexp_matches.clear()
+        self._regexp_dispatchers.clear()
 
     def start(self) -> None:
-        self._responses = []
+        self._responses = WeakSet()
         self._matches = {}
-        self.patcher.start()
-        self.patcher.return_value = self._request_mock
+        self._matches_index = {}
+        self._regexp_matches = []
+        self._regexp_dispatchers = {}
+        self._retired_stats = {}
+        self._unmatched = {}
+        if self.cassette_path is not None:
+            self._open_cassette()
+        self._activate()
 
     def stop(self) -> None:
-        for response in self._responses:
+        for response in list(self._responses):
             response.close()
-        self.patcher.stop()
+        self._deactivate()
         self.clear()
+        if self._cassette is not None:
+            self._cassette.close()
+            self._cassette = None
+        if self._cassette_writer is not None:
+            self._cassette_writer.close()
+            self._cassette_writer = None
+
+    def _activate(self) -> None:
+        """Serve requests from the mocks of this started instance."""
+        _install_patch()
+        _active_mocks.append(self)
+
+    def _deactivate(self) -> None:
+        """Stop serving requests, keeping the mocks registered."""
+        # Usually the last one, but mocks may be stopped in any order.
+        for position in range(len(_active_mocks) - 1, -1, -1):
+            if _active_mocks[position] is self:
+                del _active_mocks[position]
+                break
+
+    def _open_cassette(self) -> None:
+        record = self.cassette_mode == CASSETTE_RECORD or (
+            self.cassette_mode == CASSETTE_ONCE
+            and not os.path.exists(self.cassette_path)
+        )
+        if record:
+            self._cassette_writer = CassetteWriter(self.cassette_path)
+        elif not os.path.exists(self.cassette_path):
+            raise FileNotFoundError(
+                'Cassette %s does not exist' % (self.cassette_path,)
+            )
+        else:
+            self._cassette = Cassette(self.cassette_path)
 
     def head(self, url: 'Union[URL, str, Pattern]', **kwargs: Any) -> None:
         self.add(url, method=hdrs.METH_HEAD, **kwargs)
@@ -303,7 +809,7 @@ class aioresponses(object):
 
     def add(self, url: 'Union[URL, str, Pattern]', method: str = hdrs.METH_GET,
             status: int = 200,
-            body: Union[str, bytes] = '',
+            body: 'Union[str, bytes, StreamingBody]' = '',
             exception: Optional[Exception] = None,
             content_type: str = 'application/json',
             payload: Optional[Dict] = None,
@@ -312,9 +818,13 @@ class aioresponses(object):
             repeat: Union[bool, int] = False,
             timeout: bool = False,
             reason: Optional[str] = None,
-            callback: Optional[Callable] = None) -> None:
+            callback: Optional[Callable] = None,
+            body_file: 'Optional[Union[str, os.PathLike]]' = None,
+            latency: 'Union[None, float, Latency]' = None,
+            bandwidth: Optional[float] = None,
+            connect_latency: 'Union[None, float, Latency]' = None) -> None:
 
-        self._matches[str(uuid4())] = (RequestMatch(
+        self._register_match(RequestMatch(
             url,
             method=method,
             status=status,
@@ -328,8 +838,351 @@ class aioresponses(object):
             timeout=timeout,
             reason=reason,
             callback=callback,
+            body_file=body_file,
+            latency=latency,
+            bandwidth=bandwidth,
+            connect_latency=connect_latency,
         ))
 
+    def add_many(
+        self, routes: Iterable[Union[Mapping[str, Any], Sequence[Any]]]
+    ) -> None:
+        """Register many routes at once.
+
+        Every route is either a mapping of :meth:`add` keyword arguments or
+        a tuple of its positional ones. Each distinct url is normalized once
+        and routes with the same content type and headers share their
+        header objects, which makes loading thousands of routes cheap.
+        """
+        urls = {}  # type: Dict[Any, URL]
+        shared_headers = {}  # type: Dict[Any, ResponseHeaders]
+        for route in routes:
+            self._register_match(self._bulk_match(route, urls, shared_headers))
+
+    @staticmethod
+    def _bulk_match(route: Union[Mapping[str, Any], Sequence[Any]],
+                    urls: Dict[Any, URL],
+                    shared_headers: Dict[Any, ResponseHeaders]
+                    ) -> RequestMatch:
+        """Build the matcher of a route given to add_many()."""
+        if isinstance(route, abc.Mapping):
+            kwargs = dict(route)
+        else:
+            if len(route) > len(_ADD_PARAMETERS):
+                raise TypeError(
+                    'add() takes at most %d arguments, got a route of %d'
+                    % (len(_ADD_PARAMETERS), len(route))
+                )
+            kwargs = dict(zip(_ADD_PARAMETERS, route))
+        url = kwargs.pop('url')
+        if not isinstance(url, Pattern):
+            normalized = urls.get(url)
+            if normalized is None:
+                normalized = urls[url] = normalize_url(url, cached=False)
+            url = normalized
+        matcher = RequestMatch(url, normalize=False, **kwargs)
+        try:
+            headers_key = (
+                matcher.content_type,
+                tuple(matcher.headers.items()) if matcher.headers else (),
+            )
+            headers = shared_headers.get(headers_key)
+        except TypeError:
+            # Unhashable header values are built per route.
+            return matcher
+        if headers is None:
+            headers = shared_headers[headers_key] = matcher._build_headers(
+                matcher.content_type, matcher.headers
+            )
+        matcher._shared_headers = headers
+        return matcher
+
+    def add_har(self, path: 'Union[str, os.PathLike]',
+                repeat: Union[bool, int] = False) -> None:
+        """Register a route for every entry of the HAR capture at path.
+
+        Entries are read one at a time and registered in capture order, so
+        requests repeated in the capture get their responses in turn.
+        Bodies are decoded when they are served for the first time.
+        """
+        self.add_many(
+            dict(route, repeat=repeat) for route in iter_routes(path)
+        )
+
+    def _register_match(self, matcher: RequestMatch) -> None:
+        """Store matcher under a new key and put it into the lookup index."""
+        key = next(self._sequence)
+        self._matches[key] = matcher
+        if isinstance(matcher.url_or_pattern, Pattern):
+            self._regexp_matches.append(key)
+            dispatcher = self._regexp_dispatchers.get(matcher.method)
+            if dispatcher is not None:
+                dispatcher.add(key, matcher.url_or_pattern)
+        else:
+            index_key = (matcher.method, matcher.url_or_pattern)
+            self._matches_index.setdefault(index_key, deque()).append(key)
+
+    def _unregister_match(self, key: int) -> None:
+        """Remove matcher stored under key from the registry and index."""
+        matcher = self._matches.pop(key, None)
+        if matcher is None:
+            # Already removed, e.g. by clear().
+            return
+        self._retire_stats(key, matcher)
+        if isinstance(matcher.url_or_pattern, Pattern):
+            self._discard_entry(self._regexp_matches, key)
+            return
+        index_key = (matcher.method, matcher.url_or_pattern)
+        entries = self._matches_index[index_key]
+        self._discard_entry(entries, key)
+        if not entries:
+            del self._matches_index[index_key]
+
+    def _retire_stats(self, key: int, matcher: RequestMatch) -> None:
+        """Sum the stats of a removed matcher up with its method and url.
+
+        The matcher records into the sum from now on, as responses it
+        is building still time themselves.
+        """
+        retired_key = (matcher.method, matcher.url_or_pattern)
+        retired = self._retired_stats.get(retired_key)
+        if retired is None:
+            self._retired_stats[retired_key] = (key, matcher.stats)
+        else:
+            retired[1].merge(matcher.stats)
+            matcher.stats = retired[1]
+
+    @staticmethod
+    def _discard_entry(entries: 'Union[List[int], Deque[int]]',
+                       key: int) -> None:
+        # Consumed matchers are nearly always at the head, so this is cheap.
+        try:
+            entries.remove(key)
+        except ValueError:
+            pass
+
+    def _find_match(
+        self, method: str, url: URL
+    ) -> Optional[Tuple[int, RequestMatch]]:
+        """Return the earliest registered matcher for method and url.
+
+        Plain urls are looked up in the index, patterns are only consulted
+        when one of them was registered before the indexed hit.
+        """
+        method = method.lower()
+        found = None  # type: Optional[int]
+        entries = self._matches_index.get((method, url))
+        if entries:
+            found = entries[0]
+        regexp_matches = self._regexp_matches
+        if regexp_matches and (found is None or regexp_matches[0] < found):
+            key = self._find_pattern_match(method, str(url))
+            if key is not None and (found is None or key < found):
+                found = key
+        if found is None:
+            return None
+        return found, self._matches[found]
+
+    def _find_pattern_match(self, method: str, url: str) -> Optional[int]:
+        dispatcher = self._regexp_dispatchers.get(method)
+        if dispatcher is None:
+            dispatcher = PatternDispatcher(
+                (key, self._matches[key].url_or_pattern)
+                for key in self._regexp_matches
+                if self._matches[key].method == method
+            )
+            self._regexp_dispatchers[method] = dispatcher
+        # Consumed patterns stay in the dispatcher until they are skipped.
+        return dispatcher.find(url, self._matches.__contains__)
+
+    async def _sleep(self, delay: float) -> None:
+        """Wait for a simulated delay without blocking the loop."""
+        if self.clock is not None:
+            await self.clock.sleep(delay)
+        else:
+            await asyncio.sleep(delay)
+
+    async def _simulate(self, context: RequestContext, delay: float,
+                        limit: Optional[float],
+                        error: Callable[[], Exception]) -> None:
+        """Wait for a simulated delay within the timeouts of the request.
+
+        Like aiohttp, raise ``error()`` once ``limit`` is exceeded and
+        asyncio.TimeoutError once the total timeout is.
+        """
+        budget, budget_error = self._budget(context, limit, error)
+        if budget is not None and delay > budget:
+            await self._sleep(budget)
+            context.elapsed += budget
+            raise budget_error()
+        if delay > 0:
+            await self._sleep(delay)
+            context.elapsed += delay
+
+    @staticmethod
+    def _budget(context: RequestContext, limit: Optional[float],
+                error: Callable[[], Exception]
+                ) -> Tuple[Optional[float], Callable[[], Exception]]:
+        """Return how long may be waited and what is raised after that."""
+        remaining = context.remaining()
+        if limit is not None and (remaining is None or limit < remaining):
+            return limit, error
+        if remaining is not None:
+            return max(0.0, remaining), asyncio.TimeoutError
+        return None, error
+
+    def _now(self) -> float:
+        if self.clock is not None:
+            return self.clock.time()
+        return asyncio.get_running_loop().time()
+
+    async def _connect(self, context: RequestContext, delay: float,
+                       url: URL) -> Callable[[], None]:
+        """Take a connection from the pool and simulate connecting to url.
+
+        Return the function putting the connection back.
+        """
+        def error() -> Exception:
+            return ConnectionTimeoutError(
+                'Connection timeout to host {}'.format(url)
+            )
+
+        limit = context.connect_timeout()
+        release = _release_nothing  # type: Optional[Callable[[], None]]
+        connector = getattr(context.session, 'connector', None)
+        if self._pools is not None and connector is not None:
+            # Like aiohttp, the connect timeout includes the pool wait.
+            budget, budget_error = self._budget(context, limit, error)
+            release, waited = await self._pools.acquire(
+                connector, url, budget, self._sleep, self._now
+            )
+            context.elapsed += waited
+            if release is None:
+                raise budget_error()
+            if limit is not None:
+                limit -= waited
+        try:
+            await self._simulate(context, delay, limit, error)
+        except BaseException:
+            release()  # type: ignore[misc]
+            raise
+        return release  # type: ignore[return-value]
+
+    async def _read(self, context: RequestContext, delay: float) -> None:
+        await self._simulate(
+            context, delay, context.read_timeout(),
+            lambda: SocketTimeoutError('Timeout on reading data from socket')
+        )
+
+    async def _expire(self, context: RequestContext) -> None:
+        """Let the virtual clock run until the request times out."""
+        remaining = context.remaining()
+        if remaining is not None and remaining > 0:
+            await self._sleep(remaining)
+            context.elapsed += remaining
+
+    def _replay(self, method: str,
+                url: URL) -> Optional[Tuple[int, RequestMatch]]:
+        """Return a match serving the cassette's recording of the request."""
+        recording = self._cassette.replay(method, url)  # type: ignore
+        if recording is None:
+            return None
+        # Never registered, replayed matches repeat and are not consumed.
+        return -1, RequestMatch.from_recording(url, method, recording)
+
+    async def _pass_through(self, orig_self: ClientSession, method: str,
+                            url_origin: 'Union[URL, str]', url: URL,
+                            *args: Any, **kwargs: Any) -> ClientResponse:
+        """Make the request for real, recording it if a cassette is open."""
+        response = await _original_request(  # type: ignore[misc]
+            orig_self, method, url_origin, *args, **kwargs
+        )
+        if self._cassette_writer is not None:
+            body = await response.read()
+            self._cassette_writer.add(
+                method, url, response.status, response.reason,
+                response.headers.items(), body,
+            )
+            # Reading drained the content; clients streaming the body get
+            # the recorded bytes instead.
+            response.content = stream_reader_factory(get_response_loop())
+            response.content.feed_data(body)
+            response.content.feed_eof()
+        return response
+
+    def connector(self, **kwargs: Any) -> MockConnector:
+        """Return a connector answering requests with the mocked routes.
+
+        Sessions using it run the whole aiohttp client pipeline, which
+        :class:`ClientSession` patching skips::
+
+            async with ClientSession(connector=mocked.connector()) as s:
+                ...
+
+        kwargs are passed on to :class:`aiohttp.BaseConnector`.
+        """
+        return MockConnector(self, **kwargs)
+
+    def serve(self, host: str = '127.0.0.1', port: int = 0) -> MockServer:
+        """Return a server answering HTTP requests with the mocked routes.
+
+        Use it as an async context manager while the mock is active::
+
+            async with mocked.serve() as server:
+                # e.g. HTTP_PROXY=server.url for subprocesses
+                ...
+
+        Requests it receives are matched and recorded like mocked requests
+        of this process; the server's own url is passed through meanwhile.
+        """
+        return MockServer(self, host, port)
+
+    def _underlying_mock(self) -> 'Optional[aioresponses]':
+        """Return the active mock this one has been layered on."""
+        for position in range(len(_active_mocks) - 1, 0, -1):
+            if _active_mocks[position] is self:
+                return _active_mocks[position - 1]
+        return None
+
+    def stats(self) -> StatsSnapshot:
+        """Return hit counts and timings of every route added since start.
+
+        ``routes`` lists a summary per route in the order they were added:
+        its hits and the time spent in its callback and in building
+        responses (count, total, min, avg and p99, in seconds). Routes
+        which were consumed or cleared are summed up per method and url,
+        in the place of the first of them. ``unmatched`` counts requests
+        no route matched by (method, url).
+        """
+        routes = list(self._retired_stats.values())
+        if self._matches:
+            routes.extend(
+                (key, matcher.stats) for key, matcher in self._matches.items()
+            )
+        routes.sort(key=itemgetter(0))
+        return snapshot([stats for _, stats in routes], self._unmatched)
+
+    def pool_stats(self) -> Dict[str, PoolStats]:
+        """Return connection pool statistics per host.
+
+        Only available with ``pool_limits=True``.
+        """
+        if self._pools is None:
+            raise RuntimeError(
+                'Connection pools are only simulated with pool_limits=True'
+            )
+        return self._pools.stats()
+
+    def unconsumed(self) -> List[RequestMatch]:
+        """Return registered responses which have not been served yet.
+
+        Matches with ``repeat=True`` never run out and are not included.
+        """
+        return [
+            matcher for matcher in self._matches.values()
+            if matcher.repeat is not True
+        ]
+
     def _format_call_signature(self, *args, **kwargs) -> str:
         message = '%s(%%s)' % self.__class__.__name__ or 'mock'
         formatted_args = ''
@@ -346,19 +1199,28 @@ class aioresponses(object):
 
         return message % formatted_args
 
+    def _ensure_recorded(self, *unsupported: str) -> None:
+        """Raise if the recording mode does not keep what an assert needs."""
+        if self._recording in unsupported:
+            raise RuntimeError(
+                "Calls are not recorded with recording=%r" % (self._recording,)
+            )
+
     def assert_not_called(self):
         """assert that the mock was never called.
         """
-        if len(self.requests) != 0:
+        self._ensure_recorded(RECORDING_OFF)
+        if self._call_count != 0:
             msg = ("Expected '%s' to not have been called. Called %s times."
                    % (self.__class__.__name__,
-                      len(self._responses)))
+                      self._call_count))
             raise AssertionError(msg)
 
     def assert_called(self):
         """assert that the mock was called at least once.
         """
-        if len(self.requests) == 0:
+        self._ensure_recorded(RECORDING_OFF)
+        if self._call_count == 0:
             msg = ("Expected '%s' to have been called."
                    % (self.__class__.__name__,))
             raise AssertionError(msg)
@@ -366,9 +1228,8 @@ class aioresponses(object):
     def assert_called_once(self):
         """assert that the mock was called only once.
         """
-        call_count = len(self.requests)
-        if call_count == 1:
-            call_count = len(list(self.requests.values())[0])
+        self._ensure_recorded(RECORDING_OFF)
+        call_count = self._call_count
         if not call_count == 1:
             msg = ("Expected '%s' to have been called once. Called %s times."
                    % (self.__class__.__name__,
@@ -384,6 +1245,7 @@ class aioresponses(object):
 
         Raises an AssertionError if the args and keyword args passed in are
         different to the last call to the mock."""
+        self._ensure_recorded(RECORDING_COUNTS_ONLY, RECORDING_OFF)
         url = normalize_url(merge_params(url, kwargs.get('params')))
         method = method.upper()
         key = (method, url)
@@ -416,13 +1278,12 @@ class aioresponses(object):
         The assert passes if the mock has *ever* been called, unlike
         `assert_called_with` and `assert_called_once_with` that only pass if
         the call is the most recent one."""
+        self._ensure_recorded(RECORDING_OFF)
         url = normalize_url(merge_params(url, kwargs.get('params')))
         method = method.upper()
         key = (method, url)
 
-        try:
-            self.requests[key]
-        except KeyError:
+        if key not in self._call_counts:
             expected_string = self._format_call_signature(
                 url, method=method, *args, **kwargs
             )
@@ -453,36 +1314,79 @@ class aioresponses(object):
         url: URL,
         allow_redirects: bool = True,
         **kwargs: Any
+    ) -> Optional['ClientResponse']:
+        return await self._match(
+            RequestContext(), method, url, allow_redirects, kwargs
+        )
+
+    async def _match(
+        self, context: RequestContext,
+        method: str,
+        url: URL,
+        allow_redirects: bool,
+        kwargs: Dict[str, Any]
     ) -> Optional['ClientResponse']:
         history = []
         while True:
-            for key, matcher in self._matches.items():
-                if matcher.match(method, url):
-                    response_or_exc = await matcher.build_response(
-                        url, allow_redirects=allow_redirects, **kwargs
-                    )
-                    break
-            else:
+            context.method, context.url = method, url
+            found = self._find_match(method, url)
+            if found is None and self._cassette is not None:
+                found = self._replay(method, url)
+            if found is None:
+                unmatched_key = (method.upper(), url)
+                self._unmatched[unmatched_key] = (
+                    self._unmatched.get(unmatched_key, 0) + 1
+                )
                 return None
-
+            key, matcher = found
+            matcher.stats.hits += 1
+            await context.trace_start()
+            # Consume the match before anything is awaited, so concurrent
+            # requests cannot be served by the same response.
             if isinstance(matcher.repeat, bool):
                 if not matcher.repeat:
-                    del self._matches[key]
+                    self._unregister_match(key)
             else:
                 if matcher.repeat == 1:
-                    del self._matches[key]
+                    self._unregister_match(key)
                 matcher.repeat -= 1
 
+            release = await self._connect(
+                context, matcher.sample_connect_latency(), url
+            )
+            try:
+                await self._read(context, matcher.sample_latency())
+                if matcher.timeout and self.clock is not None:
+                    await self._expire(context)
+                response_or_exc = await matcher.build_response(
+                    url, allow_redirects=allow_redirects, **kwargs
+                )
+            except BaseException:
+                release()
+                raise
+
             if self.is_exception(response_or_exc):
+                release()
                 raise response_or_exc
             # If response_or_exc was an exception, it would have been raised.
             # At this point we can be sure it's a ClientResponse
             response: ClientResponse
             response = response_or_exc  # type:ignore[assignment]
+            if matcher.bandwidth is not None:
+                response.content = throttled_reader(
+                    response.content, matcher.bandwidth,
+                    partial(self._read, context)
+                )
+            if release is not _release_nothing:
+                # The connection goes back to the pool once the body is
+                # delivered, or the response is gone without being read.
+                on_body_done(response.content, release)
+                weakref.finalize(response, release)
             is_redirect = response.status in (301, 302, 303, 307, 308)
             if is_redirect and allow_redirects:
                 if hdrs.LOCATION not in response.headers:
                     break
+                await context.trace_redirect(response)
                 history.append(response)
                 redirect_url = URL(response.headers[hdrs.LOCATION])
                 if redirect_url.is_absolute():
@@ -504,6 +1408,11 @@ class aioresponses(object):
         """Return mocked response object or raise connection error."""
         if orig_self.closed:
             raise RuntimeError('Session is closed')
+        if isinstance(orig_self.connector, MockConnector):
+            # The connector mocks the responses below the client.
+            return await _original_request(  # type: ignore[misc]
+                orig_self, method, url, *args, **kwargs
+            )
 
         if AIOHTTP_VERSION >= Version('3.8.0'):
             # Join url with ClientSession._base_url
@@ -516,29 +1425,51 @@ class aioresponses(object):
             url_origin = url
 
         url = normalize_url(merge_params(url, kwargs.get('params')))
-        url_str = str(url)
-        for prefix in self._passthrough:
-            if url_str.startswith(prefix):
-                return (await self.patcher.temp_original(
-                    orig_self, method, url_origin, *args, **kwargs
-                ))
-
-        key = (method, url)
-        self.requests.setdefault(key, [])
-        request_call = self._build_request_call(method, *args, **kwargs)
-        self.requests[key].append(request_call)
-
-        response = await self.match(method, url, **kwargs)
+        if self._passthrough and self._passthrough.match(url):
+            # A cassette being replayed stands in for the network.
+            if self._cassette is None \
+                    or (method, url) not in self._cassette:
+                return await self._pass_through(
+                    orig_self, method, url_origin, url, *args, **kwargs
+                )
+
+        self._record_request(method, url, *args, **kwargs)
+
+        context = RequestContext(
+            orig_self, request_timeout(orig_self, kwargs),
+            RequestContext.create_traces(
+                orig_self, kwargs.get('trace_request_ctx')
+            ),
+            kwargs.get('headers'),
+        )
+        match_kwargs = dict(kwargs)
+        allow_redirects = match_kwargs.pop('allow_redirects', True)
+        try:
+            response = await self._match(
+                context, method, url, allow_redirects, match_kwargs
+            )
+        except BaseException as exc:
+            await context.trace_exception(exc)
+            raise
 
         if response is None:
-            if self.passthrough_unmatched:
-                return (await self.patcher.temp_original(
+            underlying = self._underlying_mock()
+            if self.fallthrough and underlying is not None:
+                return await underlying._request_mock(
                     orig_self, method, url_origin, *args, **kwargs
-                ))
-            raise ClientConnectionError(
+                )
+            if self.passthrough_unmatched:
+                return await self._pass_through(
+                    orig_self, method, url_origin, url, *args, **kwargs
+                )
+            error = ClientConnectionError(
                 'Connection refused: {} {}'.format(method, url)
             )
-        self._responses.append(response)
+            context.method, context.url = method, url
+            await context.trace_start()
+            await context.trace_exception(error)
+            raise error
+        self._responses.add(response)
 
         # Automatically call response.raise_for_status() on a request if the
         # request was initialized with raise_for_status=True. Also call
@@ -551,13 +1482,42 @@ class aioresponses(object):
                 orig_self, '_raise_for_status', False
             )
 
-        if callable(raise_for_status):
-            await raise_for_status(response)
-        elif raise_for_status:
-            response.raise_for_status()
-
+        try:
+            if callable(raise_for_status):
+                await raise_for_status(response)
+            elif raise_for_status:
+                response.raise_for_status()
+        except BaseException as exc:
+            await context.trace_exception(exc)
+            raise
+
+        await context.trace_end(response)
         return response
 
+    def _record_request(self, method: str, url: URL,
+                        *args: Any, **kwargs: Any) -> None:
+        """Record the call as far as the recording mode asks for."""
+        recording = self._recording
+        if recording == RECORDING_OFF:
+            return
+        key = (method, url)
+        self._call_counts[key] = self._call_counts.get(key, 0) + 1
+        self._call_count += 1
+        if recording == RECORDING_COUNTS_ONLY:
+            return
+        request_call = self._build_request_call(method, *args, **kwargs)
+        if not isinstance(recording, RingBuffer):
+            self.requests.setdefault(key, []).append(request_call)
+            return
+        self.requests.setdefault(key, deque()).append(request_call)
+        self._recorded_keys.append(key)
+        if len(self._recorded_keys) > recording.size:
+            oldest = self._recorded_keys.popleft()
+            calls = self.requests[oldest]
+            calls.popleft()
+            if not calls:
+                del self.requests[oldest]
+
     def _build_request_call(self, method: str = hdrs.METH_GET,
                             *args: Any,
                             allow_redirects: bool = True,
@@ -567,9 +1527,16 @@ class aioresponses(object):
         if method == 'POST':
             kwargs.setdefault('data', None)
 
+        if self._recording != RECORDING_FULL:
+            # kwargs is a fresh dict already, only the values are shared.
+            return RequestCall(args, kwargs)
         try:
             kwargs_copy = copy.deepcopy(kwargs)
         except (TypeError, ValueError):
             # Handle the fact that some values cannot be deep copied
             kwargs_copy = kwargs
         return RequestCall(args, kwargs_copy)
+
+
+# Positional parameters of aioresponses.add(), for tuples given to add_many().
+_ADD_PARAMETERS = tuple(inspect.signature(aioresponses.add).parameters)[1:]
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""Routes read from HAR captures, see :meth:`aioresponses.add_har`.
+
+A HAR file is one JSON document whose ``log.entries`` array holds every
+request and response. The parser here walks the document incrementally
+and decodes a single entry at a time, so memory stays proportional to
+the largest entry rather than the whole capture. Response bodies are
+kept as the text found in the file and only decoded when a response is
+built from them for the first time.
+"""
+import base64
+import json
+import os
+import re
+from typing import IO, Any, Dict, Iterator, Optional, Union
+
+from multidict import CIMultiDict
+
+# Headers describing how the captured body was transferred; HAR stores
+# the decoded body.
+_TRANSFER_HEADERS = frozenset(
+    ('content-encoding', 'content-length', 'transfer-encoding')
+)
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Characters that may continue a JSON number.
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+
+CHUNK_SIZE = 2 ** 16
+
+
+class HarError(ValueError):
+    """The file is not a HAR capture or it is damaged."""
+
+
+class HarContent(object):
+    """Response body of a HAR entry, decoded on first use."""
+    __slots__ = ('text', 'encoding')
+
+    def __init__(self, text: str, encoding: Optional[str] = None):
+        self.text = text
+        self.encoding = encoding
+
+    def __bytes__(self) -> bytes:
+        if self.encoding == 'base64':
+            return base64.b64decode(self.text)
+        return self.text.encode('utf8')
+
+    def __repr__(self) -> str:
+        return 'HarContent(%d chars, %r)' % (len(self.text), self.encoding)
+
+
+class _Scanner(object):
+    """Read JSON values one by one from a growing text buffer."""
+
+    def __init__(self, fp: IO[str], chunk_size: int = CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        if self._eof:
+            return False
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        chunk = self._fp.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character, '' at the end."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill(self._chunk_size):
+                return ''
+
+    def expect(self, token: str) -> None:
+        found = self.peek()
+        if found != token:
+            raise HarError('Expected %r, found %r' % (token, found or 'EOF'))
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as exc:
+                # The value may just be cut off by the end of the buffer;
+                # read as much again so large values take few retries.
+                if not self._fill(max(self._chunk_size, len(self._buffer))):
+                    raise HarError('Invalid JSON: %s' % (exc,)) from None
+            else:
+                if self._cut_off(value, end) and self._fill(self._chunk_size):
+                    continue
+                self._pos = end
+                return value
+
+    def _cut_off(self, value: Any, end: int) -> bool:
+        """Tell if value may be a number cut off by the end of the buffer.
+
+        Those decode as a shorter number, e.g. 12 of 123 or 1 of 1.5.
+        """
+        return isinstance(value, (int, float)) and (
+            _NUMBER_TAIL.match(self._buffer, end).end() == len(self._buffer)
+        )
+
+    def members(self) -> Iterator[str]:
+        """Yield the keys of an object, leaving each value to the caller."""
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise HarError('Expected an object key, found %r' % (key,))
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self._pos += 1
+                continue
+            self.expect('}')
+            return
+
+    def items(self) -> Iterator[Any]:
+        """Decode the elements of an array one at a time."""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ',':
+                self._pos += 1
+                continue
+            self.expect(']')
+            return
+
+
+def iter_entries(fp: IO[str],
+                 chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield the entries of the HAR document read from fp in order."""
+    scanner = _Scanner(fp, chunk_size)
+    found = False
+    for key in scanner.members():
+        if key != 'log':
+            scanner.value()
+            continue
+        for log_key in scanner.members():
+            if log_key != 'entries':
+                scanner.value()
+                continue
+            found = True
+            yield from scanner.items()
+    if not found:
+        raise HarError('No log.entries in the document')
+
+
+def entry_route(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the keyword arguments of aioresponses.add() for entry."""
+    try:
+        request = entry['request']
+        response = entry['response']
+        method = request['method']
+        url = request['url']
+        status = response['status']
+    except (KeyError, TypeError) as exc:
+        raise HarError('Incomplete entry, missing %s' % (exc,)) from None
+    headers = CIMultiDict(
+        (header['name'], header['value'])
+        for header in response.get('headers', ())
+        if header['name'].lower() not in _TRANSFER_HEADERS
+    )
+    content = response.get('content') or {}
+    content_type = headers.get(
+        'Content-Type', content.get('mimeType') or 'application/octet-stream'
+    )
+    return {
+        'url': url,
+        'method': method,
+        'status': status,
+        'reason': response.get('statusText') or None,
+        'headers': headers,
+        'content_type': content_type,
+        'body': HarContent(content.get('text') or '', content.get('encoding')),
+    }
+
+
+def iter_routes(path: 'Union[str, os.PathLike]',
+                chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield the routes of the HAR capture at path."""
+    with open(path, encoding='utf8') as fp:
+        for entry in iter_entries(fp, chunk_size):
+            route = entry_route(entry)
+            # Browsers record aborted and blocked requests with status 0.
+            if route['status']:
+                yield route
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""Simulated server latency of mocked routes.
+
+``latency`` of :meth:`aioresponses.add` accepts a number of seconds or one
+of the distributions below. Every distribution draws from its own seeded
+:class:`random.Random`, so a given seed reproduces the same delays.
+
+:class:`VirtualClock` lets these delays pass without waiting for them.
+"""
+import abc
+import asyncio
+import bisect
+import heapq
+import math
+import random
+from itertools import count
+from typing import Dict, List, Optional, Tuple, Union
+
+
+class Latency(abc.ABC):
+    """Base class of latency distributions."""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.random = random.Random(seed)
+
+    @abc.abstractmethod
+    def sample(self) -> float:
+        """Return the next delay in seconds."""
+
+
+class FixedLatency(Latency):
+    """The same delay for every response."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        if delay < 0:
+            raise ValueError('Latency must not be negative, got %r' % delay)
+        self.delay = delay
+
+    def sample(self) -> float:
+        return self.delay
+
+    def __repr__(self) -> str:
+        return 'FixedLatency(%r)' % self.delay
+
+
+class NormalLatency(Latency):
+    """Normally distributed delays, negative samples are clipped to 0."""
+
+    def __init__(self, mean: float, stddev: float,
+                 seed: Optional[int] = None):
+        super().__init__(seed)
+        self.mean = mean
+        self.stddev = stddev
+
+    def sample(self) -> float:
+        return max(0.0, self.random.normalvariate(self.mean, self.stddev))
+
+    def __repr__(self) -> str:
+        return 'NormalLatency(%r, %r)' % (self.mean, self.stddev)
+
+
+class LogNormalLatency(Latency):
+    """Log-normally distributed delays, the usual shape of server latency.
+
+    ``median`` is the median delay in seconds and ``sigma`` the standard
+    deviation of the underlying normal distribution.
+    """
+
+    def __init__(self, median: float, sigma: float,
+                 seed: Optional[int] = None):
+        super().__init__(seed)
+        if median <= 0:
+            raise ValueError('Median must be positive, got %r' % median)
+        self.median = median
+        self.sigma = sigma
+
+    def sample(self) -> float:
+        return self.random.lognormvariate(math.log(self.median), self.sigma)
+
+    def __repr__(self) -> str:
+        return 'LogNormalLatency(%r, %r)' % (self.median, self.sigma)
+
+
+class PercentileLatency(Latency):
+    """Delays following a table of percentiles, e.g. taken from production.
+
+    ``percentiles`` maps a percentile (0-100) to the delay at that
+    percentile; delays between two points are interpolated linearly.
+    """
+
+    def __init__(self, percentiles: Dict[float, float],
+                 seed: Optional[int] = None):
+        super().__init__(seed)
+        if not percentiles:
+            raise ValueError('At least one percentile is required')
+        points = sorted(percentiles.items())
+        if points[0][0] < 0 or points[-1][0] > 100:
+            raise ValueError('Percentiles must be within 0 and 100')
+        self._ranks = [rank for rank, _ in points]
+        self._delays = [delay for _, delay in points]
+
+    def sample(self) -> float:
+        rank = self.random.uniform(0, 100)
+        position = bisect.bisect_left(self._ranks, rank)
+        if position == 0:
+            return self._delays[0]
+        if position == len(self._ranks):
+            return self._delays[-1]
+        low, high = self._ranks[position - 1], self._ranks[position]
+        fraction = (rank - low) / (high - low)
+        return self._delays[position - 1] + fraction * (
+            self._delays[position] - self._delays[position - 1]
+        )
+
+    def __repr__(self) -> str:
+        return 'PercentileLatency(%r)' % dict(zip(self._ranks, self._delays))
+
+
+def as_latency(value: 'Union[None, float, Latency]') -> Optional[Latency]:
+    """Turn the latency argument of add() into a distribution."""
+    if value is None or isinstance(value, Latency):
+        return value
+    return FixedLatency(value)
+
+
+class VirtualClock(object):
+    """Clock advanced by simulated delays instead of the passage of time.
+
+    Whenever the loop has nothing else to run, the sleeper with the
+    earliest deadline is woken and the clock jumps to its deadline, so
+    delays complete in simulated order without taking any wall time.
+    """
+
+    # How often the clock yields to other callbacks before advancing
+    # anyway, e.g. next to a coroutine polling with asyncio.sleep(0).
+    max_yields = 1000
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._sleepers: List[Tuple[float, int, asyncio.Future]] = []
+        self._sequence = count()
+        # Loop a wake up is scheduled on, if any.
+        self._waking = None  # type: Optional[asyncio.AbstractEventLoop]
+
+    def time(self) -> float:
+        """Return the current virtual time in seconds."""
+        return self._now
+
+    def advance(self, delay: float) -> None:
+        """Move the clock forward without waking anybody up."""
+        if delay < 0:
+            raise ValueError('Cannot go back in time, got %r' % delay)
+        self._now += delay
+
+    async def sleep(self, delay: float) -> None:
+        """Wait until the clock has been advanced by delay seconds."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(
+            self._sleepers,
+            (self._now + max(0.0, delay), next(self._sequence), future)
+        )
+        if self._waking is not loop:
+            self._waking = loop
+            loop.call_soon(self._wake_next, loop)
+        await future
+
+    def _settled(self, loop: asyncio.AbstractEventLoop, yields: int) -> bool:
+        """Return True once nothing but the clock is left to run."""
+        # Only the pure Python loop exposes its ready queue, other loops
+        # get a fixed number of iterations.
+        ready = getattr(loop, '_ready', None)
+        if ready is None:
+            return yields >= 10
+        return not ready or yields >= self.max_yields
+
+    def _wake_next(self, loop: asyncio.AbstractEventLoop,
+                   yields: int = 0) -> None:
+        if not self._settled(loop, yields):
+            loop.call_soon(self._wake_next, loop, yields + 1)
+            return
+        self._waking = None
+        while self._sleepers:
+            deadline, _, future = heapq.heappop(self._sleepers)
+            if future.done():
+                # Cancelled while sleeping.
+                continue
+            self._now = max(self._now, deadline)
+            future.set_result(None)
+            break
+        if self._sleepers:
+            self._waking = loop
+            loop.call_soon(self._wake_next, loop)
+
+    def __repr__(self) -> str:
+        return 'VirtualClock(%r)' % self._now
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Rules deciding which requests reach the network for real.
+
+Url prefixes are compiled into a character trie, so a request is checked
+against all of them in one walk along its url, however many there are.
+Hosts are looked up in a set; regular expressions, matched against the
+whole url like pattern routes, are tried one after the other.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .compat import URL, Pattern
+
+Rule = Union[str, Pattern]
+
+# Key of a trie node marking the end of a prefix.
+_END = ''
+
+
+class PassthroughRules(object):
+    """Url prefixes, patterns and hosts of requests to pass through."""
+
+    def __init__(self, rules: Iterable[Rule] = (),
+                 hosts: Iterable[str] = ()):
+        self._prefixes: List[str] = []
+        self._patterns: List[Pattern] = []
+        self._hosts = frozenset(host.lower() for host in hosts)
+        self._trie: Optional[Dict[str, Any]] = None
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule: Rule) -> None:
+        if isinstance(rule, Pattern):
+            self._patterns.append(rule)
+            return
+        self._prefixes.append(str(rule))
+        self._trie = None
+
+    def remove(self, rule: Rule) -> None:
+        """Remove a rule added before, ValueError if there is none."""
+        if isinstance(rule, Pattern):
+            self._patterns.remove(rule)
+            return
+        self._prefixes.remove(str(rule))
+        self._trie = None
+
+    def _compile(self) -> Dict[str, Any]:
+        trie: Dict[str, Any] = {}
+        for prefix in self._prefixes:
+            node = trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            # Anything below a shorter prefix matches already.
+            node.clear()
+            node[_END] = True
+        return trie
+
+    def _match_prefix(self, url: str) -> bool:
+        node = self._trie
+        if node is None:
+            node = self._trie = self._compile()
+        if _END in node:
+            return True
+        for char in url:
+            node = node.get(char)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+    def match(self, url: URL) -> bool:
+        """Return True if a request to url is to be passed through."""
+        if self._hosts and url.host is not None \
+                and url.host.lower() in self._hosts:
+            return True
+        if not self._prefixes and not self._patterns:
+            return False
+        url_str = str(url)
+        if self._prefixes and self._match_prefix(url_str):
+            return True
+        for pattern in self._patterns:
+            if pattern.match(url_str):
+                return True
+        return False
+
+    def __bool__(self) -> bool:
+        return bool(self._prefixes or self._patterns or self._hosts)
+
+    def __repr__(self) -> str:
+        return 'PassthroughRules(%r, hosts=%r)' % (
+            self._prefixes + self._patterns, sorted(self._hosts)
+        )
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Simulated connection pool limits of aiohttp connectors.
+
+Mocked requests never reach the connector, so its ``limit`` and
+``limit_per_host`` are enforced here with a semaphore per connector and
+per host. A slot is held from the time the request is sent until its
+body has been delivered, like a pooled connection is.
+"""
+import asyncio
+from collections import namedtuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from .compat import URL
+
+# Connections handed out for a host, how many of them had to be waited
+# for and how long that took in total and at most.
+PoolStats = namedtuple(
+    'PoolStats', ['acquired', 'queued', 'total_wait', 'max_wait']
+)
+
+HostKey = Tuple[Optional[str], Optional[int], bool]
+
+
+class ConnectorSlots(object):
+    """Semaphores standing for the connections of one connector."""
+
+    def __init__(self, limit: int, limit_per_host: int):
+        self.limit = asyncio.Semaphore(limit) if limit else None
+        self.limit_per_host = limit_per_host
+        self._per_host = {}  # type: Dict[HostKey, asyncio.Semaphore]
+
+    def semaphores(self, key: HostKey) -> List[asyncio.Semaphore]:
+        """Return the semaphores a request to key has to acquire."""
+        semaphores = []
+        if self.limit_per_host:
+            semaphore = self._per_host.get(key)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.limit_per_host)
+                self._per_host[key] = semaphore
+            semaphores.append(semaphore)
+        if self.limit is not None:
+            semaphores.append(self.limit)
+        return semaphores
+
+
+def _releaser(semaphores: List[asyncio.Semaphore]) -> Callable[[], None]:
+    released = False
+
+    def release() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            for semaphore in semaphores:
+                semaphore.release()
+
+    return release
+
+
+def _abandon(semaphore: asyncio.Semaphore, waiter: asyncio.Future) -> None:
+    """Stop waiting for semaphore, giving back a slot already acquired."""
+    if not waiter.cancel() and not waiter.cancelled() \
+            and waiter.exception() is None:
+        semaphore.release()
+
+
+async def acquire_all(
+    semaphores: List[asyncio.Semaphore],
+    timeout: Optional[float],
+    sleep: Callable[[float], Awaitable[Any]],
+) -> Optional[Callable[[], None]]:
+    """Acquire every semaphore and return a function releasing them.
+
+    Return None, holding nothing, if they could not all be acquired
+    within timeout seconds of sleep.
+    """
+    acquired = []  # type: List[asyncio.Semaphore]
+    timer = None  # type: Optional[asyncio.Future]
+    waiter = None  # type: Optional[asyncio.Future]
+    try:
+        for semaphore in semaphores:
+            if timeout is not None and semaphore.locked():
+                if timer is None:
+                    timer = asyncio.ensure_future(sleep(timeout))
+                waiter = asyncio.ensure_future(semaphore.acquire())
+                await asyncio.wait(
+                    (waiter, timer), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not waiter.done():
+                    # The semaphore hands a slot it has just given to a
+                    # cancelled waiter on to the next one.
+                    _abandon(semaphore, waiter)
+                    waiter = None
+                    _releaser(acquired)()
+                    return None
+                waiter = None
+            else:
+                await semaphore.acquire()
+            acquired.append(semaphore)
+    except BaseException:
+        # Cancelled while queued: the waiter must not take a slot nobody
+        # is going to release.
+        if waiter is not None:
+            _abandon(semaphore, waiter)
+        _releaser(acquired)()
+        raise
+    finally:
+        if timer is not None:
+            timer.cancel()
+    return _releaser(acquired)
+
+
+class ConnectionPools(object):
+    """Connection slots of every connector used with a mock."""
+
+    def __init__(self) -> None:
+        self._slots = WeakKeyDictionary()  # type: WeakKeyDictionary
+        # [acquired, queued, total wait, max wait] per host.
+        self._stats = {}  # type: Dict[str, List[Any]]
+
+    def _connector_slots(self, connector: Any) -> ConnectorSlots:
+        slots = self._slots.get(connector)
+        if slots is None:
+            slots = ConnectorSlots(
+                getattr(connector, 'limit', 0),
+                getattr(connector, 'limit_per_host', 0),
+            )
+            self._slots[connector] = slots
+        return slots
+
+    async def acquire(
+        self, connector: Any, url: URL,
+        timeout: Optional[float],
+        sleep: Callable[[float], Awaitable[Any]],
+        now: Callable[[], float],
+    ) -> Tuple[Optional[Callable[[], None]], float]:
+        """Wait for a connection to url, see :func:`acquire_all`.
+
+        Return the release function, or None on timeout, and the time
+        spent waiting.
+        """
+        key = (url.host, url.port, url.scheme in ('https', 'wss'))
+        semaphores = self._connector_slots(connector).semaphores(key)
+        queued = any(semaphore.locked() for semaphore in semaphores)
+        start = now()
+        release = await acquire_all(semaphores, timeout, sleep)
+        waited = now() - start
+        if release is not None:
+            stats = self._stats.setdefault(
+                '%s:%s' % (url.host, url.port), [0, 0, 0.0, 0.0]
+            )
+            stats[0] += 1
+            if queued:
+                stats[1] += 1
+                stats[2] += waited
+                stats[3] = max(stats[3], waited)
+        return release, waited
+
+    def stats(self) -> Dict[str, PoolStats]:
+        """Return the statistics of every host requested so far."""
+        return {
+            host: PoolStats(*values) for host, values in self._stats.items()
+        }
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""pytest plugin providing aioresponses fixtures.
+
+``aioresponses_shared`` holds mocks for the whole session, e.g. added from a
+session scoped fixture in ``conftest.py``. They are served only while a
+test uses the ``aioresponses`` fixture, which is layered on top of them:
+its own mocks win and whatever it does not match falls through to the
+shared ones. Other tests make their requests for real.
+
+ini options:
+
+``aioresponses_scope``
+    scope of the ``aioresponses`` fixture, ``function`` by default.
+``aioresponses_unconsumed``
+    what to do with mocks left unconsumed at fixture teardown: ``warn``
+    (default), ``fail`` or ``ignore``.
+"""
+import warnings
+from typing import Any, Iterator, List
+
+import pytest
+
+from .core import RequestMatch, aioresponses as _aioresponses
+
+UNCONSUMED_ACTIONS = ('warn', 'fail', 'ignore')
+
+
+class UnconsumedResponsesWarning(UserWarning):
+    """Mocked responses were registered but never requested."""
+
+
+def pytest_addoption(parser: Any) -> None:
+    parser.addini(
+        'aioresponses_scope',
+        help='scope of the aioresponses fixture (default: function)',
+        default='function',
+    )
+    parser.addini(
+        'aioresponses_unconsumed',
+        help='action for mocks not consumed at teardown: '
+             'warn (default), fail or ignore',
+        default='warn',
+    )
+
+
+def _fixture_scope(fixture_name: str, config: Any) -> str:
+    return config.getini('aioresponses_scope')
+
+
+def _format_matches(matches: List[RequestMatch]) -> str:
+    return ', '.join(
+        '%s %s' % (matcher.method.upper(), matcher.url_or_pattern)
+        for matcher in matches
+    )
+
+
+def _report_unconsumed(mocked: _aioresponses, config: Any) -> None:
+    action = config.getini('aioresponses_unconsumed')
+    if action not in UNCONSUMED_ACTIONS:
+        raise pytest.UsageError(
+            'aioresponses_unconsumed must be one of %s, got %r'
+            % (', '.join(UNCONSUMED_ACTIONS), action)
+        )
+    unconsumed = mocked.unconsumed()
+    if not unconsumed or action == 'ignore':
+        return
+    message = 'Unconsumed mocked responses: %s' % _format_matches(unconsumed)
+    if action == 'fail':
+        pytest.fail(message, pytrace=False)
+    warnings.warn(message, UnconsumedResponsesWarning)
+
+
+@pytest.fixture(scope='session')
+def aioresponses_shared(pytestconfig: Any) -> Iterator[_aioresponses]:
+    """Mocks shared by the whole test session."""
+    mocked = _aioresponses()
+    mocked.start()
+    # Only active below the aioresponses fixture of a test.
+    mocked._deactivate()
+    try:
+        yield mocked
+        _report_unconsumed(mocked, pytestconfig)
+    finally:
+        mocked.stop()
+
+
+@pytest.fixture(scope=_fixture_scope)
+def aioresponses(
+    aioresponses_shared: _aioresponses, pytestconfig: Any
+) -> Iterator[_aioresponses]:
+    """Mocks of a single test, layered on top of the shared ones."""
+    aioresponses_shared._activate()
+    try:
+        with _aioresponses(fallthrough=True) as mocked:
+            yield mocked
+            _report_unconsumed(mocked, pytestconfig)
+    finally:
+        aioresponses_shared._deactivate()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Serve mocked responses over HTTP, see :meth:`aioresponses.serve`.
+
+Patching ``ClientSession`` only reaches clients in the same process. The
+server here answers real HTTP requests from the routes of a mock, so
+subprocesses and clients other than aiohttp can use them too. Requests
+name their target either in absolute form, as sent to an HTTP proxy, or
+through their Host header; both are matched like a mocked request to
+that url would be, and are recorded in the mock's ``requests``.
+"""
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from aiohttp import hdrs, web
+
+from .compat import URL, normalize_url
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .core import aioresponses
+
+# Headers of a mocked response that the server sets itself.
+_TRANSFER_HEADERS = frozenset(
+    ('content-length', 'transfer-encoding', 'connection')
+)
+
+
+class MockServer(object):
+    """Local HTTP server answering requests with the routes of a mock.
+
+    The mock has to be started while the server runs. Requests without a
+    matching route, or whose route raises an exception, are answered with
+    ``502 Bad Gateway``.
+    """
+
+    def __init__(self, mocked: 'aioresponses',
+                 host: str = '127.0.0.1', port: int = 0):
+        self.mocked = mocked
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.ServerRunner] = None
+        self.url: Optional[URL] = None
+
+    async def start(self) -> URL:
+        """Start listening and return the url of the server."""
+        if self._runner is not None:
+            raise RuntimeError('Server is running already')
+        runner = web.ServerRunner(web.Server(self._handle))
+        await runner.setup()
+        site = web.TCPSite(runner, self.host, self.port)
+        await site.start()
+        self._runner = runner
+        host, port = runner.addresses[0][:2]
+        self.url = URL.build(scheme='http', host=host, port=port)
+        # Clients of the patched session in this process reach the server
+        # for real.
+        self.mocked._passthrough.add(str(self.url))
+        return self.url
+
+    async def close(self) -> None:
+        if self._runner is None:
+            return
+        try:
+            self.mocked._passthrough.remove(str(self.url))
+        except ValueError:
+            pass
+        await self._runner.cleanup()
+        self._runner = None
+
+    async def __aenter__(self) -> 'MockServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _handle(self, request: web.BaseRequest) -> web.StreamResponse:
+        url = normalize_url(request.url)
+        kwargs: Dict[str, Any] = {'headers': request.headers.copy()}
+        if request.can_read_body:
+            kwargs['data'] = await request.read()
+        self.mocked._record_request(request.method, url, **kwargs)
+        try:
+            response = await self.mocked.match(
+                request.method, url, allow_redirects=False, **kwargs
+            )
+        except Exception as exc:
+            return web.Response(status=502, text='%s: %s' % (
+                type(exc).__name__, exc
+            ))
+        if response is None:
+            return web.Response(
+                status=502,
+                text='No mocked response for %s %s' % (request.method, url),
+            )
+        try:
+            answer = web.StreamResponse(
+                status=response.status, reason=response.reason
+            )
+            for name, value in response.headers.items():
+                if name.lower() not in _TRANSFER_HEADERS:
+                    answer.headers.add(name, value)
+            await answer.prepare(request)
+            if request.method != hdrs.METH_HEAD:
+                # Throttled bodies keep their pace on the wire.
+                async for chunk in response.content.iter_any():
+                    await answer.write(chunk)
+            await answer.write_eof()
+        finally:
+            response.release()
+        return answer
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Hit counters and timings of mocked routes, see :meth:`aioresponses.stats`.
+"""
+import math
+import random
+from collections import namedtuple
+from typing import Any, Dict, List, Optional, Tuple
+
+from .compat import URL
+
+# Durations are in seconds.
+TimingSummary = namedtuple(
+    'TimingSummary', ['count', 'total', 'min', 'avg', 'p99']
+)
+RouteSummary = namedtuple(
+    'RouteSummary', ['method', 'url', 'hits', 'callback', 'build']
+)
+StatsSnapshot = namedtuple('StatsSnapshot', ['routes', 'unmatched'])
+
+# Percentiles are computed over a uniform sample of this many durations.
+RESERVOIR_SIZE = 1024
+
+_random = random.Random(0)
+
+
+class Timing(object):
+    """Accumulated durations of one operation."""
+    __slots__ = ('count', 'total', 'min', '_samples')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self._samples = []  # type: List[float]
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        if duration < self.min:
+            self.min = duration
+        if len(self._samples) < RESERVOIR_SIZE:
+            self._samples.append(duration)
+        else:
+            position = _random.randrange(self.count)
+            if position < RESERVOIR_SIZE:
+                self._samples[position] = duration
+
+    def merge(self, other: 'Timing') -> None:
+        """Add the durations of other, as if they had been added here."""
+        if len(other._samples) == other.count:
+            for duration in other._samples:
+                self.add(duration)
+            return
+        # Both samples stand for more durations than they hold; keep a
+        # share of each in proportion to the durations it stands for.
+        count = self.count + other.count
+        own = round(RESERVOIR_SIZE * self.count / count)
+        self._samples = (
+            _random.sample(self._samples, min(own, len(self._samples)))
+            + _random.sample(other._samples,
+                             min(RESERVOIR_SIZE - own, len(other._samples)))
+        )
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+
+    def summary(self) -> Optional[TimingSummary]:
+        if not self.count:
+            return None
+        samples = sorted(self._samples)
+        p99 = samples[max(0, math.ceil(len(samples) * 0.99) - 1)]
+        return TimingSummary(
+            self.count, self.total, self.min, self.total / self.count, p99
+        )
+
+
+class RouteStats(object):
+    """Hits of a route and the time spent serving them.
+
+    Timings are created when the route is served for the first time;
+    most routes of a large capture never are.
+    """
+    __slots__ = ('method', 'url', 'hits', '_callback', '_build')
+
+    def __init__(self, method: str, url: Any):
+        self.method = method
+        self.url = url
+        self.hits = 0
+        self._callback = None  # type: Optional[Timing]
+        self._build = None  # type: Optional[Timing]
+
+    @property
+    def callback(self) -> Timing:
+        if self._callback is None:
+            self._callback = Timing()
+        return self._callback
+
+    @property
+    def build(self) -> Timing:
+        if self._build is None:
+            self._build = Timing()
+        return self._build
+
+    def merge(self, other: 'RouteStats') -> None:
+        """Add the hits and timings of other."""
+        self.hits += other.hits
+        if other._callback is not None:
+            self.callback.merge(other._callback)
+        if other._build is not None:
+            self.build.merge(other._build)
+
+    def summary(self) -> RouteSummary:
+        return RouteSummary(
+            self.method.upper(), self.url, self.hits,
+            self._callback and self._callback.summary(),
+            self._build and self._build.summary(),
+        )
+
+
+def snapshot(routes: List[RouteStats],
+             unmatched: Dict[Tuple[str, URL], int]) -> StatsSnapshot:
+    """Return an immutable view of routes and unmatched requests."""
+    return StatsSnapshot(
+        tuple(route.summary() for route in routes), dict(unmatched)
+    )
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import inspect
+import mmap
+import os
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
+
+from aiohttp import StreamReader
+
+from .compat import StreamProtocol, get_response_loop
+
+Chunk = Union[str, bytes]
+StreamingBody = Union[
+    Iterable[Chunk],
+    AsyncIterable[Chunk],
+    Callable[[], Any],
+]
+
+READ_LIMIT = 2 ** 16
+
+
+class MappedFile(object):
+    """File served through a read-only memory map.
+
+    The file is mapped on first use and the mapping is shared by every
+    response iterating over it. Each iteration yields fresh slices of the
+    mapping, so the file content is never copied as a whole.
+    """
+
+    def __init__(self, path: 'Union[str, os.PathLike]',
+                 chunk_size: int = READ_LIMIT):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._map = None  # type: Optional[mmap.mmap]
+        self._size = None  # type: Optional[int]
+
+    def _open(self) -> None:
+        with open(self.path, 'rb') as fp:
+            self._size = os.fstat(fp.fileno()).st_size
+            if self._size:
+                # The mapping stays valid once the file object is closed.
+                self._map = mmap.mmap(
+                    fp.fileno(), 0, access=mmap.ACCESS_READ
+                )
+
+    def __len__(self) -> int:
+        if self._size is None:
+            self._open()
+        return self._size  # type: ignore[return-value]
+
+    def __iter__(self) -> Iterator[bytes]:
+        size = len(self)
+        mapping = self._map
+        for start in range(0, size, self.chunk_size):
+            yield mapping[start:start + self.chunk_size]  # type: ignore
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._size = None
+
+    def __repr__(self) -> str:
+        return 'MappedFile(%r)' % (self.path,)
+
+
+class MappedSlice(object):
+    """Part of a memory map, served in chunks like :class:`MappedFile`."""
+
+    def __init__(self, mapping: mmap.mmap, start: int, size: int,
+                 chunk_size: int = READ_LIMIT):
+        self.mapping = mapping
+        self.start = start
+        self.size = size
+        self.chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[bytes]:
+        end = self.start + self.size
+        for start in range(self.start, end, self.chunk_size):
+            yield self.mapping[start:min(start + self.chunk_size, end)]
+
+    def __repr__(self) -> str:
+        return 'MappedSlice(%d, %d)' % (self.start, self.size)
+
+
+def is_streaming_body(body: Any) -> bool:
+    """Return True if body has to be produced chunk by chunk."""
+    if isinstance(body, (str, bytes, bytearray, memoryview, Mapping)):
+        return False
+    return (
+        callable(body)
+        or hasattr(body, '__aiter__')
+        or hasattr(body, '__iter__')
+    )
+
+
+def _encode(chunk: Any) -> bytes:
+    if isinstance(chunk, bytes):
+        return chunk
+    if isinstance(chunk, str):
+        return chunk.encode('utf8')
+    return bytes(chunk)
+
+
+async def iter_body(body: Any) -> AsyncIterator[bytes]:
+    """Yield encoded chunks of a str, bytes or streaming body.
+
+    A callable body is a factory: it is called once per response and may
+    return (or resolve to) any other supported body.
+    """
+    if callable(body):
+        body = body()
+        if inspect.isawaitable(body):
+            body = await body
+    if not is_streaming_body(body):
+        yield _encode(body)
+    elif hasattr(body, '__aiter__'):
+        async for chunk in body:
+            yield _encode(chunk)
+    else:
+        for chunk in body:
+            yield _encode(chunk)
+
+
+class LazyStreamReader(StreamReader):
+    """StreamReader pulling its data from a chunk source on demand.
+
+    Instead of waiting for the network, a read that runs out of buffered
+    data pulls the next chunk from the source, the way a socket read hands
+    over whatever has arrived. Chunks larger than the reader's ``limit``
+    are fed in ``limit`` sized pieces, so about ``limit`` bytes are buffered
+    at any time, however large the body is.
+    """
+
+    def __init__(self, source: AsyncIterator[bytes],
+                 limit: int = READ_LIMIT,
+                 loop: 'Optional[asyncio.AbstractEventLoop]' = None):
+        if loop is None:
+            loop = get_response_loop()
+        super().__init__(StreamProtocol(), limit, loop=loop)
+        self._source = source  # type: Optional[AsyncIterator[bytes]]
+        self._remainder = memoryview(b'')
+        self._pulling = False
+        self._done_callbacks: List[Callable[[], None]] = []
+
+    def on_done(self, callback: Callable[[], None]) -> None:
+        """Call callback once the body has been delivered or has failed."""
+        if self._source is None:
+            callback()
+        else:
+            self._done_callbacks.append(callback)
+
+    def _done(self) -> None:
+        self._source = None
+        callbacks, self._done_callbacks = self._done_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def set_exception(self, exc: BaseException, *args: Any) -> None:
+        super().set_exception(exc, *args)
+        self._done()
+
+    async def _wait(self, func_name: str) -> None:
+        if self._source is None:
+            await super()._wait(func_name)
+            return
+        if self._pulling:
+            raise RuntimeError(
+                '%s() called while another coroutine is '
+                'already waiting for incoming data' % func_name
+            )
+        self._pulling = True
+        try:
+            await self._pull()
+        finally:
+            self._pulling = False
+
+    async def _pull(self) -> None:
+        remainder = self._remainder
+        while not remainder:
+            try:
+                chunk = await self._source.__anext__()  # type: ignore
+            except StopAsyncIteration:
+                self.feed_eof()
+                self._done()
+                return
+            except Exception as exc:
+                self.set_exception(exc)
+                raise
+            remainder = memoryview(chunk)
+        limit = self._low_water
+        if len(remainder) <= limit:
+            self._remainder = memoryview(b'')
+            self.feed_data(remainder.tobytes())
+        else:
+            self._remainder = remainder[limit:]
+            self.feed_data(remainder[:limit].tobytes())
+
+
+def on_body_done(reader: StreamReader, callback: Callable[[], None]) -> None:
+    """Call callback once reader has delivered all of its data or failed."""
+    if isinstance(reader, LazyStreamReader):
+        reader.on_done(callback)
+    else:
+        reader.on_eof(callback)
+
+
+async def iter_reader(reader: StreamReader) -> AsyncIterator[bytes]:
+    """Yield the data of reader as it becomes available."""
+    while True:
+        chunk = await reader.readany()
+        if not chunk:
+            return
+        yield chunk
+
+
+async def throttle(source: AsyncIterator[bytes], bandwidth: float,
+                   sleep: Callable[[float], Any] = asyncio.sleep
+                   ) -> AsyncIterator[bytes]:
+    """Yield the data of source at no more than bandwidth bytes per second.
+
+    Data is delivered in pieces of about a tenth of a second worth of
+    transfer, each one after the time it takes to transfer it.
+    """
+    piece_size = max(1, min(READ_LIMIT, int(bandwidth / 10)))
+    async for chunk in source:
+        for start in range(0, len(chunk), piece_size):
+            piece = chunk[start:start + piece_size]
+            await sleep(len(piece) / bandwidth)
+            yield piece
+
+
+def throttled_reader(reader: StreamReader, bandwidth: float,
+                     sleep: Callable[[float], Any] = asyncio.sleep
+                     ) -> LazyStreamReader:
+    """Return a reader delivering the data of reader at bandwidth."""
+    limit, _ = reader.get_read_buffer_limits()
+    return LazyStreamReader(
+        throttle(iter_reader(reader), bandwidth, sleep), limit=limit
+    )
+
+
+def stream_body(body: Any,
+                limit: int = READ_LIMIT,
+                loop: 'Optional[asyncio.AbstractEventLoop]' = None
+                ) -> LazyStreamReader:
+    """Return a reader producing body lazily as the client reads it."""
+    return LazyStreamReader(iter_body(body), limit=limit, loop=loop)
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from typing import Any, Awaitable, Callable, Iterator
+
+import pytest
+
+# Operations per benchmark round for the cheap, per-request code paths,
+# so loop overhead does not drown the measured code.
+BATCH = 1000
+
+
+@pytest.fixture
+def loop() -> Iterator[asyncio.AbstractEventLoop]:
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+@pytest.fixture
+def run_batch(loop: asyncio.AbstractEventLoop
+              ) -> Callable[[Callable[[], Awaitable[Any]]], None]:
+    """Return a function awaiting factory() BATCH times in a row."""
+    def run(factory: Callable[[], Awaitable[Any]]) -> None:
+        async def batch() -> None:
+            for _ in range(BATCH):
+                await factory()
+        loop.run_until_complete(batch())
+    return run
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import re
+
+import pytest
+from yarl import URL
+
+from aioresponses import aioresponses
+from aioresponses.core import PatternDispatcher
+from aioresponses.passthrough import PassthroughRules
+
+
+@pytest.fixture(params=[10, 1000])
+def routes(request):
+    return request.param
+
+
+def test_match_exact(benchmark, run_batch, routes):
+    with aioresponses() as mocked:
+        for i in range(routes):
+            mocked.get('http://example.com/route/%d' % i, repeat=True)
+        url = URL('http://example.com/route/%d' % (routes - 1))
+        benchmark(run_batch, lambda: mocked.match('GET', url))
+
+
+def test_match_regex(benchmark, run_batch, routes):
+    with aioresponses() as mocked:
+        for i in range(routes):
+            mocked.get(
+                re.compile(r'http://example\.com/route/%d$' % i), repeat=True
+            )
+        url = URL('http://example.com/route/%d' % (routes - 1))
+        benchmark(run_batch, lambda: mocked.match('GET', url))
+
+
+def test_drain_patterns(benchmark, loop, routes):
+    """Serve responses queued by adding the same pattern again and again."""
+    pattern = re.compile(r'http://example\.com/api/\d+')
+    url = URL('http://example.com/api/1')
+
+    def register():
+        mocked = aioresponses()
+        mocked.start()
+        for _ in range(routes):
+            mocked.get(pattern)
+        return (mocked,), {}
+
+    async def drain(mocked):
+        for _ in range(routes):
+            await mocked.match('GET', url)
+
+    def run(mocked):
+        loop.run_until_complete(drain(mocked))
+        mocked.stop()
+
+    benchmark.pedantic(run, setup=register, rounds=10, iterations=1)
+
+
+def first_match(patterns, url):
+    for key, pattern in patterns:
+        if pattern.match(url):
+            return key
+    return None
+
+
+@pytest.mark.parametrize('url', ['http://x.test/item/999?page=2',
+                                 'http://x.test/other'],
+                         ids=['last', 'miss'])
+@pytest.mark.parametrize('dispatch', ['dispatcher', 'loop'])
+def test_pattern_dispatch(benchmark, dispatch, url):
+    """Look up an url among 1k patterns, against trying them in turn."""
+    patterns = [(i, re.compile(r'http://x\.test/item/%d(\?.*)?$' % i))
+                for i in range(1000)]
+    if dispatch == 'loop':
+        benchmark(first_match, patterns, url)
+    else:
+        benchmark(PatternDispatcher(patterns).find, url)
+
+
+@pytest.mark.parametrize('length', [1, 10])
+def test_redirect_chain(benchmark, run_batch, length):
+    with aioresponses() as mocked:
+        for i in range(length):
+            mocked.get(
+                'http://example.com/%d' % i, status=302, repeat=True,
+                headers={'Location': 'http://example.com/%d' % (i + 1)},
+            )
+        mocked.get('http://example.com/%d' % length, repeat=True)
+        url = URL('http://example.com/0')
+        benchmark(run_batch, lambda: mocked.match('GET', url))
+
+
+@pytest.mark.parametrize('prefixes', [10, 500])
+def test_passthrough_check(benchmark, prefixes):
+    """Requests which are not passed through still check every rule."""
+    rules = PassthroughRules(
+        'http://service-%d.internal:8080/' % i for i in range(prefixes)
+    )
+    url = URL('http://service-7.internal/api/items?page=1')
+    benchmark(rules.match, url)
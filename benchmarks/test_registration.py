@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import re
+
+import pytest
+
+from aioresponses import aioresponses
+
+
+def register(count: int, pattern: bool = False) -> aioresponses:
+    mocked = aioresponses()
+    mocked.start()
+    for i in range(count):
+        url = 'http://example.com/route/%d' % i
+        mocked.get(re.compile(re.escape(url)) if pattern else url)
+    return mocked
+
+
+def bench_register(benchmark, count: int, pattern: bool = False,
+                   rounds: int = 10) -> None:
+    mocks = []
+    benchmark.pedantic(
+        lambda: mocks.append(register(count, pattern)),
+        rounds=rounds, iterations=1,
+    )
+    for mocked in mocks:
+        mocked.stop()
+
+
+@pytest.mark.parametrize('count', [10, 1000, 100000])
+def test_add(benchmark, count):
+    bench_register(benchmark, count, rounds=3 if count == 100000 else 10)
+
+
+@pytest.mark.parametrize('count', [10, 1000])
+def test_add_pattern(benchmark, count):
+    bench_register(benchmark, count, pattern=True)
+
+
+def test_start_stop(benchmark):
+    def start_stop():
+        with aioresponses():
+            pass
+
+    benchmark(start_stop)
+
+
+@pytest.mark.parametrize('count', [10, 1000])
+def test_stop_with_routes(benchmark, count):
+    benchmark.pedantic(
+        lambda mocked: mocked.stop(),
+        setup=lambda: ((register(count),), {}),
+        rounds=20, iterations=1,
+    )
+
+
+@pytest.mark.parametrize('count', [1000, 100000])
+def test_add_many(benchmark, count):
+    # Fixtures typically register several responses per url.
+    routes = [
+        ('http://example.com/route/%d?page=1' % (i // 4), 'GET', 200, 'ok')
+        for i in range(count)
+    ]
+    mocks = []
+
+    def register_many():
+        mocked = aioresponses()
+        mocked.start()
+        mocked.add_many(routes)
+        mocks.append(mocked)
+
+    benchmark.pedantic(
+        register_many, rounds=3 if count == 100000 else 10, iterations=1
+    )
+    for mocked in mocks:
+        mocked.stop()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import pytest
+from aiohttp import ClientSession
+from yarl import URL
+
+from aioresponses import aioresponses
+from aioresponses.core import RequestMatch
+
+URL_ = URL('http://example.com/api')
+
+SMALL_PAYLOAD = {'id': 1, 'name': 'example'}
+LARGE_PAYLOAD = {'items': [{'id': i, 'name': 'item %d' % i}
+                           for i in range(10000)]}
+PAYLOADS = {'small': SMALL_PAYLOAD, 'large': LARGE_PAYLOAD}
+
+
+@pytest.mark.parametrize('size', ['small', 'large'])
+def test_build_response(benchmark, run_batch, size):
+    matcher = RequestMatch(URL_, payload=PAYLOADS[size], repeat=True)
+    benchmark(run_batch, lambda: matcher.build_response(URL_))
+
+
+@pytest.mark.parametrize('size', ['small', 'large'])
+def test_build_first_response(benchmark, loop, size):
+    """The first response of a route also encodes the body."""
+    def build(matcher):
+        loop.run_until_complete(matcher.build_response(URL_))
+
+    benchmark.pedantic(
+        build,
+        setup=lambda: ((RequestMatch(URL_, payload=PAYLOADS[size]),), {}),
+        rounds=50, iterations=1,
+    )
+
+
+@pytest.mark.parametrize('recording', ['full', 'shallow'])
+@pytest.mark.parametrize('size', ['small', 'large'])
+def test_build_request_call(benchmark, recording, size):
+    mocked = aioresponses(recording=recording)
+    benchmark(
+        mocked._build_request_call, 'POST', json=PAYLOADS[size],
+        headers={'Accept': 'application/json'},
+    )
+
+
+@pytest.mark.parametrize('interception', ['session', 'connector'])
+def test_request(benchmark, loop, run_batch, interception):
+    """A whole request, read; the connector runs aiohttp's parser too."""
+    mocked = aioresponses()
+    mocked.start()
+    mocked.get(URL_, payload=SMALL_PAYLOAD, repeat=True)
+
+    async def create_session():
+        if interception == 'connector':
+            return ClientSession(connector=mocked.connector())
+        return ClientSession()
+
+    session = loop.run_until_complete(create_session())
+
+    async def request():
+        response = await session.get(URL_)
+        await response.read()
+
+    try:
+        benchmark(run_batch, request)
+    finally:
+        loop.run_until_complete(session.close())
+        mocked.stop()
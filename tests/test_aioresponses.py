@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 import asyncio
+import gc
+import os
 import re
+import tempfile
 from asyncio import CancelledError, TimeoutError
 from random import uniform
 from typing import Coroutine, Generator, Union
@@ -8,7 +11,8 @@ from unittest.mock import patch
 
 from aiohttp import hdrs
 from aiohttp import http
-from aiohttp.client import ClientSession
+from aiohttp import ServerTimeoutError, TCPConnector, TraceConfig
+from aiohttp.client import ClientSession, ClientTimeout
 from aiohttp.client_reqrep import ClientResponse
 from ddt import ddt, data, unpack
 from packaging.version import Version
@@ -26,8 +30,16 @@ except ImportError:
     )
     from aiohttp.http_exceptions import HttpProcessingError
 
-from aioresponses.compat import AIOHTTP_VERSION, URL
-from aioresponses import CallbackResult, aioresponses
+from aioresponses.compat import (
+    AIOHTTP_VERSION,
+    URL,
+    ConnectionTimeoutError,
+    SocketTimeoutError,
+)
+from aioresponses import CallbackResult, aioresponses, ring_buffer
+from aioresponses.core import PatternDispatcher
+from aioresponses.stats import StatsSnapshot
+from aioresponses.pool import acquire_all
 from .base import fail_on, skipIf, AsyncTestCase
 
 
@@ -125,6 +137,22 @@ class AIOResponsesTestCase(AsyncTestCase):
 
         self.assertEqual(response.cookies['cookie'].value, 'value')
 
+    @aioresponses()
+    async def test_repeated_response_is_built_from_template(self, m):
+        m.get(self.url,
+              payload={'foo': 'bar'},
+              headers={'Set-Cookie': 'cookie=value'},
+              repeat=True)
+        first = await self.session.get(self.url)
+        second = await self.session.get(self.url)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(await first.json(), {'foo': 'bar'})
+        self.assertEqual(await second.json(), {'foo': 'bar'})
+        self.assertEqual(first.raw_headers, second.raw_headers)
+        self.assertEqual(second.headers['Set-Cookie'], 'cookie=value')
+        self.assertEqual(second.cookies['cookie'].value, 'value')
+
     @aioresponses()
     async def test_returned_response_raw_headers(self, m):
         m.get(self.url,
@@ -251,6 +279,114 @@ class AIOResponsesTestCase(AsyncTestCase):
         content = await resp.content.read(2)
         self.assertEqual(content, b'st')
 
+    @aioresponses()
+    async def test_streaming_async_iterator_body(self, m):
+        async def body():
+            for chunk in (b'Te', 'st', b'!'):
+                yield chunk
+
+        m.get(self.url, body=body())
+        resp = await self.session.get(self.url)
+        content = await resp.read()
+        self.assertEqual(content, b'Test!')
+
+    @aioresponses()
+    async def test_streaming_iterable_body_repeated(self, m):
+        m.get(self.url, body=[b'Te', b'st'], repeat=True)
+        for _ in range(2):
+            resp = await self.session.get(self.url)
+            self.assertEqual(await resp.text(), 'Test')
+
+    @aioresponses()
+    async def test_streaming_body_factory(self, m):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return iter([b'Test'])
+
+        m.get(self.url, body=factory, repeat=True)
+        first = await self.session.get(self.url)
+        second = await self.session.get(self.url)
+        self.assertEqual(await first.read(), b'Test')
+        self.assertEqual(await second.read(), b'Test')
+        self.assertEqual(len(calls), 2)
+
+    @aioresponses()
+    async def test_streaming_body_is_fed_lazily(self, m):
+        chunk = b'x' * 1024
+        produced = []
+
+        def body():
+            for i in range(1024):
+                produced.append(i)
+                yield chunk
+
+        m.get(self.url, body=body())
+        resp = await self.session.get(self.url)
+        self.assertEqual(produced, [])
+
+        data = await resp.content.read(10)
+        self.assertEqual(data, b'x' * 10)
+        self.assertEqual(len(produced), 1)
+
+        size = 10
+        async for data in resp.content.iter_chunked(4096):
+            size += len(data)
+        self.assertEqual(size, 1024 * len(chunk))
+        self.assertEqual(len(produced), 1024)
+
+    @aioresponses()
+    async def test_streaming_body_large_chunks_are_split(self, m):
+        m.get(self.url, body=[b'x' * (3 * 2 ** 16 + 1)])
+        resp = await self.session.get(self.url)
+        low, _ = resp.content.get_read_buffer_limits()
+        sizes = [len(chunk) async for chunk in resp.content.iter_any()]
+        self.assertEqual(sizes, [low, low, low, 1])
+
+    @aioresponses()
+    async def test_streaming_body_exception(self, m):
+        def body():
+            yield b'Te'
+            raise ValueError('oops')
+
+        m.get(self.url, body=body())
+        resp = await self.session.get(self.url)
+        self.assertEqual(await resp.content.read(2), b'Te')
+        with self.assertRaises(ValueError):
+            await resp.content.read()
+
+    @aioresponses()
+    async def test_body_file(self, m):
+        content = os.urandom(3 * 2 ** 16 + 7)
+        with tempfile.NamedTemporaryFile(delete=False) as fp:
+            fp.write(content)
+        self.addCleanup(os.unlink, fp.name)
+
+        m.get(self.url, body_file=fp.name, repeat=True)
+        matcher, = m._matches.values()
+        first = await self.session.get(self.url)
+        mapped_file = matcher._template.body
+        second = await self.session.get(self.url)
+        self.assertEqual(await first.read(), content)
+        self.assertEqual(await second.read(), content)
+        # The mapping is shared by all responses of a repeated match.
+        self.assertIs(matcher._template.body, mapped_file)
+        self.assertEqual(len(mapped_file), len(content))
+
+    @aioresponses()
+    async def test_empty_body_file_via_callback(self, m):
+        with tempfile.NamedTemporaryFile(delete=False) as fp:
+            pass
+        self.addCleanup(os.unlink, fp.name)
+
+        m.get(self.url, callback=lambda *_, **__: CallbackResult(
+            body_file=fp.name, status=201
+        ))
+        resp = await self.session.get(self.url)
+        self.assertEqual(resp.status, 201)
+        self.assertEqual(await resp.read(), b'')
+
     @aioresponses()
     async def test_binary_body(self, m):
         body = b'Invalid utf-8: \x95\x00\x85'
@@ -406,6 +542,80 @@ class AIOResponsesTestCase(AsyncTestCase):
             self.assertEqual(third_request.kwargs,
                              {'allow_redirects': True, "json": [3]})
 
+    async def test_shallow_recording(self):
+        json_content_as_ref = [1]
+        with aioresponses(recording='shallow') as m:
+            m.get(self.url, repeat=True)
+            await self.session.get(self.url, json=json_content_as_ref)
+            json_content_as_ref.append(2)
+
+            key = ('GET', URL(self.url))
+            request = m.requests[key][0]
+            self.assertIs(request.kwargs['json'], json_content_as_ref)
+            m.assert_called_once_with(self.url, json=[1, 2])
+
+    async def test_counts_only_recording(self):
+        with aioresponses(recording='counts_only') as m:
+            m.get(self.url, repeat=True)
+            m.assert_not_called()
+            await self.session.get(self.url, json=[1])
+
+            self.assertEqual(m.requests, {})
+            m.assert_called()
+            m.assert_called_once()
+            m.assert_any_call(self.url)
+            with self.assertRaises(RuntimeError):
+                m.assert_called_with(self.url, json=[1])
+
+            await self.session.get(self.url, json=[1])
+            with self.assertRaises(AssertionError):
+                m.assert_called_once()
+
+    async def test_ring_buffer_recording(self):
+        with aioresponses(recording=ring_buffer(2)) as m:
+            m.get(re.compile(r'^http://example\.com/'), repeat=True)
+            for i in range(3):
+                await self.session.get(self.url, json=[i])
+            await self.session.get('http://example.com/other')
+
+            key = ('GET', URL(self.url))
+            self.assertEqual(
+                [call.kwargs['json'] for call in m.requests[key]], [[2]]
+            )
+            self.assertEqual(len(m.requests), 2)
+            m.assert_called_with(self.url, json=[2])
+            with self.assertRaises(AssertionError):
+                m.assert_called_once()
+
+    async def test_recording_off(self):
+        with aioresponses(recording='off') as m:
+            m.get(self.url)
+            await self.session.get(self.url, json=[1])
+
+            self.assertEqual(m.requests, {})
+            with self.assertRaises(RuntimeError):
+                m.assert_called()
+            with self.assertRaises(RuntimeError):
+                m.assert_any_call(self.url)
+
+    async def test_released_responses_are_not_retained(self):
+        with aioresponses(recording='off') as m:
+            m.get(self.url, repeat=True)
+            kept = await self.session.get(self.url)
+            for _ in range(100):
+                resp = await self.session.get(self.url)
+                await resp.read()
+            del resp
+            gc.collect()
+
+            self.assertEqual(list(m._responses), [kept])
+
+    def test_unknown_recording_mode(self):
+        with self.assertRaises(ValueError):
+            aioresponses(recording='deep')
+        with self.assertRaises(ValueError):
+            ring_buffer(0)
+
     async def test_request_with_non_deepcopyable_parameter(self):
         def non_deep_copyable():
             """A generator does not allow deepcopy."""
@@ -441,6 +651,52 @@ class AIOResponsesTestCase(AsyncTestCase):
             self.assertEqual(m.requests[key][0].kwargs,
                              {'allow_redirects': True})
 
+    async def test_nested_mocks(self):
+        with aioresponses() as outer:
+            outer.get(self.url, status=201, repeat=True)
+            with aioresponses() as inner:
+                inner.get(self.url, status=202)
+                response = await self.session.get(self.url)
+                self.assertEqual(response.status, 202)
+                with self.assertRaises(ClientConnectionError):
+                    await self.session.get(self.url)
+            response = await self.session.get(self.url)
+            self.assertEqual(response.status, 201)
+            outer.assert_called_once()
+
+    async def test_fallthrough_to_underlying_mock(self):
+        with aioresponses() as shared:
+            shared.get(self.url, status=201)
+            with aioresponses(fallthrough=True) as overlay:
+                overlay.get(self.url, status=202, repeat=2)
+                overlay.post(self.url)
+                for status in (202, 202, 201):
+                    response = await self.session.get(self.url)
+                    self.assertEqual(response.status, status)
+                with self.assertRaises(ClientConnectionError):
+                    await self.session.get(self.url)
+
+                self.assertEqual(
+                    [str(m.url_or_pattern) for m in overlay.unconsumed()],
+                    [self.url]
+                )
+                self.assertEqual(shared.unconsumed(), [])
+
+    async def test_mocks_stopped_out_of_order(self):
+        first = aioresponses()
+        second = aioresponses()
+        first.start()
+        second.start()
+        first.get(self.url, status=201)
+        second.get(self.url, status=202)
+        try:
+            first.stop()
+            response = await self.session.get(self.url)
+            self.assertEqual(response.status, 202)
+        finally:
+            second.stop()
+        first.assert_not_called()
+
     async def test_request_failure_in_case_session_is_closed(self):
         async def do_request(session):
             return (await session.get(self.url))
@@ -627,6 +883,113 @@ class AIOResponsesTestCase(AsyncTestCase):
         with self.assertRaises(ClientConnectionError):
             await self.session.get(self.url)
 
+    @aioresponses()
+    async def test_first_registered_match_wins(self, m: aioresponses):
+        pattern = re.compile(r'^http://example\.com/api.*$')
+        m.get(pattern, status=201)
+        m.get(self.url, status=202, repeat=2)
+        m.get(pattern, status=203)
+
+        response = await self.session.get(self.url)
+        self.assertEqual(response.status, 201)
+        response = await self.session.get(self.url)
+        self.assertEqual(response.status, 202)
+        response = await self.session.get(self.url)
+        self.assertEqual(response.status, 202)
+        response = await self.session.get(self.url)
+        self.assertEqual(response.status, 203)
+        with self.assertRaises(ClientConnectionError):
+            await self.session.get(self.url)
+
+    @aioresponses()
+    async def test_earliest_matching_regexp_wins(self, m: aioresponses):
+        m.get(re.compile(r'^http://example\.com/other$'), status=200)
+        m.get(re.compile(r'^http://example\.com/(api)\?'), status=201)
+        m.get(re.compile(r'^HTTP://EXAMPLE\.COM/API', re.I), status=202)
+        m.get(re.compile(r'^http://(?P<host>example)\.com'), status=203)
+
+        response = await self.session.get(self.url)
+        self.assertEqual(response.status, 201)
+        response = await self.session.get(self.url)
+        self.assertEqual(response.status, 202)
+        m.get(re.compile(r'^http://example\.com/api'), status=204)
+        response = await self.session.get(self.url)
+        self.assertEqual(response.status, 203)
+        response = await self.session.get(self.url)
+        self.assertEqual(response.status, 204)
+        response = await self.session.get('http://example.com/other')
+        self.assertEqual(response.status, 200)
+
+    @data(
+        (r'http://example\.com/api/\d+', 'http://example.com/api/'),
+        (r'^http://example\.com/(api|v2)', 'http://example.com/'),
+        (r'http://example\.com/apis?', 'http://example.com/api'),
+        (r'http://example\.com/a+b', 'http://example.com/a'),
+        (r'http://[a|b]\.com', 'http://'),
+        (r'http://a\.com|http://b\.com', ''),
+        (r'(?i)http://example\.com', ''),
+        (r'\w+://example\.com', ''),
+    )
+    @unpack
+    def test_pattern_literal_prefix(self, source, prefix):
+        self.assertEqual(
+            PatternDispatcher.literal_prefix(re.compile(source)), prefix
+        )
+        self.assertEqual(PatternDispatcher.literal_prefix(
+            re.compile(source, re.IGNORECASE)
+        ), '')
+
+    def test_pattern_dispatcher(self):
+        dispatcher = PatternDispatcher([
+            (0, re.compile(r'http://example\.com/api/\d+$')),
+            (1, re.compile(r'http://example\.com/api/1')),
+            (2, re.compile(r'.*/api/')),
+            (3, re.compile(r'http://example\.com/a')),
+        ])
+        self.assertEqual(dispatcher.find('http://example.com/api/12'), 0)
+        self.assertEqual(dispatcher.find('http://example.com/api/1x'), 1)
+        self.assertEqual(dispatcher.find('http://other.com/api/'), 2)
+        self.assertEqual(dispatcher.find('http://example.com/about'), 3)
+        self.assertIsNone(dispatcher.find('http://other.com/'))
+        dispatcher.add(4, re.compile(r'http://example\.com/api/12$'))
+        alive = {1, 2, 4}.__contains__
+        self.assertEqual(dispatcher.find('http://example.com/api/12', alive),
+                         1)
+        self.assertEqual(dispatcher.find('http://example.com/api/2', alive),
+                         2)
+        alive = {4}.__contains__
+        self.assertEqual(dispatcher.find('http://example.com/api/12', alive),
+                         4)
+        self.assertIsNone(dispatcher.find('http://example.com/api/', alive))
+
+    @aioresponses()
+    async def test_drain_repeated_pattern(self, m: aioresponses):
+        pattern = re.compile(r'http://example\.com/api/\d+')
+        for status in range(200, 210):
+            m.get(pattern, status=status)
+        for status in range(200, 205):
+            response = await self.session.get('http://example.com/api/1')
+            self.assertEqual(response.status, status)
+        m.get(re.compile(r'http://example\.com/api/1$'), status=299)
+        for status in range(205, 210):
+            response = await self.session.get('http://example.com/api/1')
+            self.assertEqual(response.status, status)
+        response = await self.session.get('http://example.com/api/1')
+        self.assertEqual(response.status, 299)
+
+    @aioresponses()
+    async def test_many_registered_urls(self, m: aioresponses):
+        for i in range(100):
+            m.get('http://example.com/api/{}'.format(i), status=200 + i)
+        m.post('http://example.com/api/42', status=500)
+
+        response = await self.session.post('http://example.com/api/42')
+        self.assertEqual(response.status, 500)
+        response = await self.session.get('http://example.com/api/42')
+        self.assertEqual(response.status, 242)
+        with self.assertRaises(ClientConnectionError):
+            await self.session.get('http://example.com/api/42')
+
     @aioresponses()
     async def test_assert_any_call(self, m: aioresponses):
         http_bin_url = "http://httpbin.org"
@@ -664,6 +1027,362 @@ class AIOResponsesTestCase(AsyncTestCase):
         self.assertEqual(request.args, ())
         self.assertEqual(request.kwargs, kwargs)
 
+    async def test_latency(self):
+        with aioresponses() as mocked:
+            mocked.get(self.url, latency=0.05, repeat=True)
+            start = self.loop.time()
+            responses = await asyncio.gather(*(
+                self.session.get(self.url) for _ in range(10)
+            ))
+            elapsed = self.loop.time() - start
+
+        self.assertEqual([r.status for r in responses], [200] * 10)
+        # Delays of concurrent requests overlap.
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, 0.5)
+
+    async def test_concurrent_requests_consume_match_once(self):
+        with aioresponses() as mocked:
+            mocked.get(self.url, latency=0.01)
+            results = await asyncio.gather(
+                self.session.get(self.url),
+                self.session.get(self.url),
+                return_exceptions=True,
+            )
+        self.assertIsInstance(results[0], ClientResponse)
+        self.assertIsInstance(results[1], ClientConnectionError)
+
+    async def test_bandwidth(self):
+        with aioresponses() as mocked:
+            mocked.get(self.url, body=b'x' * 2000, bandwidth=20000)
+            resp = await self.session.get(self.url)
+            start = self.loop.time()
+            chunks = [chunk async for chunk in resp.content.iter_any()]
+            elapsed = self.loop.time() - start
+
+        self.assertEqual(b''.join(chunks), b'x' * 2000)
+        self.assertEqual(len(chunks), 1)
+        self.assertGreaterEqual(elapsed, 0.1)
+
+    async def test_virtual_time_latency(self):
+        with aioresponses(virtual_time=True) as mocked:
+            mocked.get(self.url, latency=30, repeat=True)
+            mocked.get(self.url + '/fast', latency=1)
+            start = self.loop.time()
+            responses = await asyncio.gather(
+                self.session.get(self.url),
+                self.session.get(self.url + '/fast'),
+            )
+            self.assertEqual(mocked.clock.time(), 30)
+            await self.session.get(self.url)
+            self.assertEqual(mocked.clock.time(), 60)
+        self.assertEqual([r.status for r in responses], [200, 200])
+        self.assertLess(self.loop.time() - start, 1)
+
+    async def test_virtual_time_timeout(self):
+        with aioresponses(virtual_time=True) as mocked:
+            mocked.get(self.url, timeout=True, repeat=True)
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.session.get(
+                    self.url, timeout=ClientTimeout(total=30)
+                )
+            self.assertEqual(mocked.clock.time(), 30)
+            # Without an explicit timeout the session's one applies.
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.session.get(self.url)
+            self.assertEqual(
+                mocked.clock.time(), 30 + self.session.timeout.total
+            )
+
+    async def test_virtual_time_bandwidth(self):
+        with aioresponses(virtual_time=True) as mocked:
+            mocked.get(self.url, body=b'x' * 2000, bandwidth=100)
+            resp = await self.session.get(self.url)
+            self.assertEqual(await resp.read(), b'x' * 2000)
+            self.assertAlmostEqual(mocked.clock.time(), 20)
+
+    @aioresponses(virtual_time=True)
+    async def test_latency_exceeding_total_timeout(self, mocked):
+        mocked.get(self.url, latency=10)
+        with self.assertRaises(asyncio.TimeoutError) as cm:
+            await self.session.get(self.url, timeout=ClientTimeout(total=3))
+        self.assertNotIsInstance(cm.exception, ServerTimeoutError)
+        self.assertEqual(mocked.clock.time(), 3)
+
+    @aioresponses(virtual_time=True)
+    async def test_latency_exceeding_read_timeout(self, mocked):
+        mocked.get(self.url, latency=10)
+        mocked.get(self.url, latency=1)
+        timeout = ClientTimeout(total=30, sock_read=2)
+        with self.assertRaises(SocketTimeoutError):
+            await self.session.get(self.url, timeout=timeout)
+        self.assertEqual(mocked.clock.time(), 2)
+        resp = await self.session.get(self.url, timeout=timeout)
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(mocked.clock.time(), 3)
+
+    @aioresponses(virtual_time=True)
+    async def test_connect_latency_exceeding_connect_timeout(self, mocked):
+        mocked.get(self.url, connect_latency=5)
+        with self.assertRaises(ConnectionTimeoutError):
+            await self.session.get(
+                self.url, timeout=ClientTimeout(connect=1, sock_connect=2)
+            )
+        self.assertEqual(mocked.clock.time(), 1)
+
+    @aioresponses(virtual_time=True)
+    async def test_body_stall_exceeding_timeouts(self, mocked):
+        mocked.get(self.url, body=b'x' * 100, bandwidth=5)
+        mocked.get(self.url, body=b'x' * 2000, bandwidth=100, latency=1)
+        resp = await self.session.get(
+            self.url, timeout=ClientTimeout(sock_read=0.1)
+        )
+        with self.assertRaises(SocketTimeoutError):
+            await resp.read()
+
+        resp = await self.session.get(
+            self.url, timeout=ClientTimeout(total=5)
+        )
+        start = mocked.clock.time()
+        with self.assertRaises(asyncio.TimeoutError):
+            await resp.read()
+        # The total timeout covers the time to headers as well.
+        self.assertAlmostEqual(mocked.clock.time() - start, 4)
+
+    @aioresponses(virtual_time=True, pool_limits=True)
+    async def test_pool_limit(self, mocked):
+        mocked.get(self.url, latency=1, repeat=True)
+        self.session = ClientSession(connector=TCPConnector(limit=2))
+        responses = await asyncio.gather(*(
+            self.session.get(self.url) for _ in range(6)
+        ))
+        self.assertEqual([r.status for r in responses], [200] * 6)
+        self.assertEqual(mocked.clock.time(), 3)
+        stats = mocked.pool_stats()['example.com:80']
+        self.assertEqual(stats.acquired, 6)
+        self.assertEqual(stats.queued, 4)
+        self.assertEqual(stats.total_wait, 6)
+        self.assertEqual(stats.max_wait, 2)
+
+    @aioresponses(virtual_time=True, pool_limits=True)
+    async def test_pool_limit_per_host(self, mocked):
+        mocked.get(self.url, latency=1, repeat=True)
+        mocked.get('http://example.org', latency=1, repeat=True)
+        self.session = ClientSession(
+            connector=TCPConnector(limit_per_host=1)
+        )
+        await asyncio.gather(
+            self.session.get(self.url),
+            self.session.get(self.url),
+            self.session.get('http://example.org'),
+            self.session.get('http://example.org'),
+        )
+        self.assertEqual(mocked.clock.time(), 2)
+        self.assertEqual(
+            sorted(mocked.pool_stats()), ['example.com:80', 'example.org:80']
+        )
+
+    @aioresponses(virtual_time=True, pool_limits=True)
+    async def test_pool_slot_held_until_body_is_read(self, mocked):
+        mocked.get(self.url, body=[b'first', b'chunk'], repeat=True)
+        self.session = ClientSession(connector=TCPConnector(limit=1))
+        first = await self.session.get(self.url)
+        with self.assertRaises(ConnectionTimeoutError):
+            await self.session.get(
+                self.url, timeout=ClientTimeout(connect=5)
+            )
+        self.assertEqual(mocked.clock.time(), 5)
+        self.assertEqual(await first.read(), b'firstchunk')
+        second = await self.session.get(self.url)
+        second.close()
+        third = await self.session.get(self.url)
+        self.assertEqual(third.status, 200)
+
+    @aioresponses(pool_limits=True)
+    async def test_cancelled_pool_waiter_frees_its_slot(self, mocked):
+        mocked.get(self.url, body=[b'first', b'chunk'], repeat=True)
+        self.session = ClientSession(connector=TCPConnector(limit=1))
+        timeout = ClientTimeout(connect=10)
+        first = await self.session.get(self.url)
+        queued = asyncio.ensure_future(
+            self.session.get(self.url, timeout=timeout)
+        )
+        for _ in range(5):
+            await asyncio.sleep(0)
+        queued.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await queued
+        self.assertEqual(await first.read(), b'firstchunk')
+        for _ in range(2):
+            response = await asyncio.wait_for(
+                self.session.get(self.url, timeout=timeout), 1
+            )
+            self.assertEqual(await response.read(), b'firstchunk')
+
+    async def test_cancelled_after_pool_slot_was_acquired(self):
+        semaphore = asyncio.Semaphore(1)
+        await semaphore.acquire()
+        task = asyncio.ensure_future(
+            acquire_all([semaphore], 10, asyncio.sleep)
+        )
+        await asyncio.sleep(0)
+        semaphore.release()
+        # The waiter takes the slot before the request gets to resume.
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertFalse(semaphore.locked())
+
+    async def test_pool_stats_requires_pool_limits(self):
+        with aioresponses() as mocked:
+            with self.assertRaises(RuntimeError):
+                mocked.pool_stats()
+
+    async def test_stats(self):
+        def callback(url, **kwargs):
+            return CallbackResult(body='from callback')
+
+        with aioresponses() as mocked:
+            mocked.get(self.url, repeat=True)
+            mocked.post(self.url, callback=callback)
+            mocked.get(re.compile(r'http://example\.com/unused'))
+            await self.session.get(self.url)
+            await self.session.get(self.url)
+            await self.session.post(self.url)
+            with self.assertRaises(ClientConnectionError):
+                await self.session.get('http://example.com/missing')
+
+        stats = mocked.stats()
+        get, post, unused = stats.routes
+        self.assertEqual((get.method, get.url, get.hits),
+                         ('GET', URL(self.url), 2))
+        self.assertIsNone(get.callback)
+        self.assertEqual(get.build.count, 2)
+        self.assertLessEqual(get.build.min, get.build.avg)
+        self.assertLessEqual(get.build.avg, get.build.p99)
+        # Consumed routes are still reported.
+        self.assertEqual(post.hits, 1)
+        self.assertEqual(post.callback.count, 1)
+        self.assertEqual(unused.hits, 0)
+        self.assertIsNone(unused.build)
+        self.assertEqual(
+            stats.unmatched,
+            {('GET', URL('http://example.com/missing')): 1}
+        )
+
+    def test_stats_before_start(self):
+        self.assertEqual(aioresponses().stats(), StatsSnapshot((), {}))
+
+    async def test_stats_of_removed_routes_are_summed_up(self):
+        with aioresponses() as mocked:
+            mocked.get('http://example.com/first')
+            for _ in range(100):
+                mocked.get(self.url)
+            mocked.post(self.url)
+            mocked.get(self.url, repeat=True)
+            for _ in range(101):
+                await self.session.get(self.url)
+            self.assertEqual(len(mocked._retired_stats), 1)
+            first, get, post, live = mocked.stats().routes
+            self.assertEqual((get.url, get.hits, get.build.count),
+                             (URL(self.url), 100, 100))
+            self.assertEqual((first.hits, post.hits, live.hits), (0, 0, 1))
+
+        # Stopping clears the routes still registered.
+        first, get, post = mocked.stats().routes
+        self.assertEqual(first.url, URL('http://example.com/first'))
+        self.assertEqual((get.hits, get.build.count), (101, 101))
+        self.assertEqual((post.method, post.hits), ('POST', 0))
+
+    async def test_add_many(self):
+        url = 'http://example.com/api'
+        with aioresponses() as mocked:
+            mocked.add_many([
+                {'url': url + '?b=2&a=1', 'payload': {'n': 1}},
+                (url + '?b=2&a=1', 'GET', 200, '{"n": 2}'),
+                (url, 'POST', 201),
+                {'url': re.compile(r'http://example\.com/items/\d+'),
+                 'body': 'item', 'content_type': 'text/plain'},
+            ])
+            first = await self.session.get(url, params={'a': 1, 'b': 2})
+            second = await self.session.get(url + '?a=1&b=2')
+            created = await self.session.post(url)
+            item = await self.session.get('http://example.com/items/7')
+            self.assertEqual(await first.json(), {'n': 1})
+            self.assertEqual(await second.json(), {'n': 2})
+            self.assertEqual(created.status, 201)
+            self.assertEqual(await item.text(), 'item')
+
+    async def test_add_many_shares_headers(self):
+        with aioresponses() as mocked:
+            mocked.add_many([
+                {'url': self.url, 'headers': {'X-Shared': '1'}},
+                {'url': self.url, 'headers': {'X-Shared': '1'}},
+                {'url': self.url, 'headers': {'X-Other': '1'}},
+            ])
+            first = await self.session.get(self.url)
+            second = await self.session.get(self.url)
+            other = await self.session.get(self.url)
+        self.assertIs(first.headers, second.headers)
+        self.assertEqual(first.headers['X-Shared'], '1')
+        self.assertNotIn('X-Shared', other.headers)
+
+    def test_add_many_rejects_long_tuples(self):
+        mocked = aioresponses()
+        with self.assertRaises(TypeError):
+            mocked.add_many([(self.url,) + (None,) * 20])
+
+    def _traced_session(self):
+        events = []
+        trace_config = TraceConfig()
+
+        def collect(name):
+            async def on_signal(session, context, params):
+                events.append((name, params, self.loop.time()))
+            return on_signal
+
+        trace_config.on_request_start.append(collect('start'))
+        trace_config.on_request_redirect.append(collect('redirect'))
+        trace_config.on_request_end.append(collect('end'))
+        trace_config.on_request_exception.append(collect('exception'))
+        self.session = ClientSession(trace_configs=[trace_config])
+        return events
+
+    async def test_trace_signals(self):
+        events = self._traced_session()
+        with aioresponses() as mocked:
+            mocked.get(self.url, status=302, latency=0.02,
+                       headers={'Location': 'http://example.com/next'})
+            mocked.get('http://example.com/next')
+            response = await self.session.get(
+                self.url, headers={'X-Trace': '1'}
+            )
+
+        self.assertEqual([name for name, _, _ in events],
+                         ['start', 'redirect', 'end'])
+        start, redirect, end = (params for _, params, _ in events)
+        self.assertEqual(start.url, URL(self.url))
+        self.assertEqual(start.headers['X-Trace'], '1')
+        self.assertEqual(redirect.response.status, 302)
+        self.assertEqual(end.url, URL('http://example.com/next'))
+        self.assertIs(end.response, response)
+        self.assertGreaterEqual(events[-1][2] - events[0][2], 0.02)
+
+    async def test_trace_exception_signals(self):
+        events = self._traced_session()
+        with aioresponses() as mocked:
+            mocked.get(self.url, exception=ValueError('boom'))
+            with self.assertRaises(ValueError):
+                await self.session.get(self.url)
+            with self.assertRaises(ClientConnectionError):
+                await self.session.get('http://example.com/missing')
+
+        self.assertEqual([name for name, _, _ in events],
+                         ['start', 'exception', 'start', 'exception'])
+        self.assertIsInstance(events[1][1].exception, ValueError)
+        self.assertEqual(events[3][1].url, URL('http://example.com/missing'))
+
     async def test_possible_race_condition(self):
         async def random_sleep_cb(url, **kwargs):
             await asyncio.sleep(uniform(0.1, 1))
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+from unittest import TestCase
+
+from aiohttp import ClientSession, web
+from aiohttp.client_exceptions import ClientConnectionError
+from aiohttp.test_utils import TestServer
+
+from aioresponses import aioresponses
+from aioresponses.cassette import Cassette, CassetteError, CassetteWriter
+from aioresponses.compat import URL
+from aioresponses.streams import READ_LIMIT, MappedSlice
+from .base import AsyncTestCase
+
+
+class CassetteFileTestCase(TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.cassette')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def test_round_trip(self):
+        url = URL('http://example.com/api')
+        writer = CassetteWriter(self.path)
+        writer.add('GET', url, 200, 'OK',
+                   [('Set-Cookie', 'a=1'), ('Set-Cookie', 'b=2'),
+                    ('Content-Encoding', 'gzip'), ('Content-Length', '25')],
+                   b'first')
+        writer.add('GET', url, 404, 'Not Found', [], b'second')
+        writer.add('POST', url, 201, 'Created', [], b'')
+        writer.close()
+
+        cassette = Cassette(self.path)
+        self.addCleanup(cassette.close)
+        self.assertIn(('GET', url), cassette)
+        self.assertNotIn(('PUT', url), cassette)
+        first = cassette.replay('get', url)
+        self.assertEqual(first.status, 200)
+        self.assertEqual(first.body, b'first')
+        # The recorded body is decoded already.
+        self.assertEqual(first.headers,
+                         [('Set-Cookie', 'a=1'), ('Set-Cookie', 'b=2')])
+        self.assertEqual(cassette.replay('GET', url).body, b'second')
+        # The last recording keeps being replayed.
+        self.assertEqual(cassette.replay('GET', url).body, b'second')
+        self.assertEqual(cassette.replay('POST', url).status, 201)
+        self.assertIsNone(cassette.replay('GET', URL('http://example.org')))
+
+    def test_large_bodies_are_served_from_the_mapping(self):
+        url = URL('http://example.com/large')
+        body = bytes(range(256)) * (READ_LIMIT // 64)
+        writer = CassetteWriter(self.path)
+        writer.add('GET', url, 200, 'OK', [], body)
+        writer.close()
+
+        cassette = Cassette(self.path)
+        self.addCleanup(cassette.close)
+        recording = cassette.replay('GET', url)
+        self.assertIsInstance(recording.body, MappedSlice)
+        self.assertEqual(len(recording.body), len(body))
+        chunks = list(recording.body)
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(b''.join(chunks), body)
+
+    def test_not_a_cassette(self):
+        with open(self.path, 'wb') as fp:
+            fp.write(b'{"some": "json"}')
+        with self.assertRaises(CassetteError):
+            Cassette(self.path).replay('GET', URL('http://example.com'))
+
+
+class CassetteTestCase(AsyncTestCase):
+
+    async def setup(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'api.cassette')
+        app = web.Application()
+        app.router.add_get('/api', self.handler)
+        app.router.add_get('/large', self.large_handler)
+        self.calls = 0
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.url = str(self.server.make_url('/api'))
+        self.session = ClientSession()
+
+    async def teardown(self):
+        await self.session.close()
+        await self.server.close()
+        self.directory.cleanup()
+
+    async def handler(self, request):
+        self.calls += 1
+        return web.json_response(
+            {'call': self.calls}, headers={'X-Call': str(self.calls)}
+        )
+
+    async def large_handler(self, request):
+        response = web.Response(body=b'x' * 100000)
+        response.enable_compression()
+        return response
+
+    async def test_recorded_body_can_be_streamed(self):
+        url = str(self.server.make_url('/large'))
+        with aioresponses(cassette=self.path, passthrough_unmatched=True):
+            response = await self.session.get(
+                url, headers={'Accept-Encoding': 'gzip'}
+            )
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            chunks = [
+                chunk async for chunk in response.content.iter_chunked(4096)
+            ]
+            self.assertEqual(b''.join(chunks), b'x' * 100000)
+
+        with aioresponses(cassette=self.path):
+            response = await self.session.get(url)
+            self.assertNotIn('Content-Encoding', response.headers)
+            # The recorded length was the one of the compressed body.
+            self.assertNotIn('Content-Length', response.headers)
+            self.assertEqual(await response.read(), b'x' * 100000)
+
+    async def test_record_then_replay(self):
+        with aioresponses(cassette=self.path, passthrough_unmatched=True):
+            first = await self.session.get(self.url)
+            second = await self.session.get(self.url)
+            self.assertEqual(await first.json(), {'call': 1})
+            self.assertEqual(await second.json(), {'call': 2})
+        self.assertEqual(self.calls, 2)
+
+        await self.server.close()
+        with aioresponses(cassette=self.path, passthrough_unmatched=True):
+            first = await self.session.get(self.url)
+            second = await self.session.get(self.url)
+            third = await self.session.get(self.url)
+            with self.assertRaises(ClientConnectionError):
+                await self.session.get(self.url + '/unknown')
+            self.assertEqual(first.headers['X-Call'], '1')
+            self.assertEqual(first.headers['Content-Type'],
+                             'application/json; charset=utf-8')
+            self.assertEqual(await second.json(), {'call': 2})
+            self.assertEqual(await third.json(), {'call': 2})
+        self.assertEqual(self.calls, 2)
+
+    async def test_replay_large_body(self):
+        body = os.urandom(READ_LIMIT * 3 + 1)
+        writer = CassetteWriter(self.path)
+        writer.add('GET', URL('http://example.com/blob'), 200, 'OK',
+                   [('Content-Type', 'application/octet-stream')], body)
+        writer.close()
+        with aioresponses(cassette=self.path):
+            response = await self.session.get('http://example.com/blob')
+            self.assertEqual(await response.read(), body)
+
+    async def test_replay_takes_precedence_over_passthrough(self):
+        origin = str(self.server.make_url(''))
+        with aioresponses(cassette=self.path, passthrough=[origin]):
+            await self.session.get(self.url)
+        with aioresponses(cassette=self.path, passthrough=[origin]):
+            response = await self.session.get(self.url)
+            self.assertEqual(await response.json(), {'call': 1})
+        self.assertEqual(self.calls, 1)
+
+    async def test_mocks_come_before_the_cassette(self):
+        with aioresponses(cassette=self.path, passthrough_unmatched=True):
+            await self.session.get(self.url)
+        with aioresponses(cassette=self.path) as mocked:
+            mocked.get(self.url, payload={'mocked': True})
+            response = await self.session.get(self.url)
+            self.assertEqual(await response.json(), {'mocked': True})
+
+    def test_replay_requires_cassette(self):
+        mocked = aioresponses(cassette=self.path, cassette_mode='replay')
+        with self.assertRaises(FileNotFoundError):
+            mocked.start()
+        with self.assertRaises(ValueError):
+            aioresponses(cassette=self.path, cassette_mode='sometimes')
@@ -2,10 +2,19 @@
 from typing import Union
 from unittest import TestCase
 
-from ddt import ddt, data
+from ddt import ddt, data, unpack
 from yarl import URL
 
-from aioresponses.compat import merge_params
+from aioresponses.compat import (
+    _MISSING,
+    CacheInfo,
+    LRUCache,
+    get_response_loop,
+    merge_params,
+    normalize_url,
+    stream_reader_factory,
+    url_cache,
+)
 
 
 def get_url(url: str, as_str: bool) -> Union[URL, str]:
@@ -46,3 +55,61 @@ class CompatTestCase(TestCase):
         url = get_url(self.url_without_parameters, as_str)
 
         self.assertEqual(merge_params(url, {'x': 42}), expected_url)
+
+    def test_stream_reader_outside_of_running_loop(self):
+        loop = get_response_loop()
+        self.assertFalse(loop.get_debug())
+
+        reader = stream_reader_factory()
+        reader.feed_data(b'Test')
+        reader.feed_eof()
+        self.assertEqual(reader.read_nowait(), b'Test')
+        self.assertTrue(reader.at_eof())
+
+    def test_cached_urls(self):
+        url_cache.clear()
+        self.addCleanup(url_cache.clear)
+        url = 'http://example.com/api?b=2&a=1'
+        first = normalize_url(merge_params(url, {'c': 3}))
+        second = normalize_url(merge_params(url, {'c': 3}))
+        self.assertIs(first, second)
+        self.assertEqual(first, URL('http://example.com/api?a=1&b=2&c=3'))
+        self.assertEqual(url_cache.info(), CacheInfo(2, 2, 1024, 2))
+        # Equal values of other types give other query strings.
+        self.assertEqual(merge_params(url, {'c': 3.0}).query['c'], '3.0')
+        # Unhashable params are merged without the cache.
+        self.assertEqual(merge_params(url, {'c': [3, 4]}).query.getall('c'),
+                         ['3', '4'])
+        self.assertEqual(url_cache.info().currsize, 3)
+
+    @data(
+        ('a=1', 'a=1'),
+        ('b=2&a.b=1&a=3', 'a=3&a.b=1&b=2'),
+        ('b=2&a=1#x', 'a=1&b=2#x'),
+        ('b=x y&a=1', 'a=1&b=x+y'),
+        ('b=&a=~1', 'a=~1'),
+    )
+    @unpack
+    def test_normalize_query(self, query, expected):
+        url_cache.clear()
+        self.addCleanup(url_cache.clear)
+        url = 'http://example.com/api?' + query
+        normalized = normalize_url(url, cached=False)
+        self.assertEqual(str(normalized), 'http://example.com/api?' + expected)
+        self.assertEqual(url_cache.info().currsize, 0)
+        self.assertEqual(normalize_url(url), normalized)
+
+    def test_lru_cache(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertEqual(cache.get('b'), _MISSING)
+        self.assertEqual(cache.info(), CacheInfo(1, 1, 2, 2))
+        cache.resize(1)
+        self.assertEqual(cache.get('a'), _MISSING)
+        self.assertEqual(cache.get('c'), 3)
+        cache.resize(0)
+        cache.put('d', 4)
+        self.assertEqual(cache.info().currsize, 0)
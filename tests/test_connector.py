@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import gzip
+
+from aiohttp import ClientConnectionError, ClientSession
+
+from aioresponses import CallbackResult, aioresponses
+from aioresponses.compat import URL
+from .base import AsyncTestCase
+
+
+class MockConnectorTestCase(AsyncTestCase):
+
+    async def setup(self):
+        self.mocked = aioresponses()
+        self.mocked.start()
+        self.session = ClientSession(connector=self.mocked.connector())
+
+    async def teardown(self):
+        await self.session.close()
+        self.mocked.stop()
+
+    async def test_response_is_parsed_by_aiohttp(self):
+        body = b'{"compressed": true}'
+        self.mocked.get('http://example.com/api',
+                        body=gzip.compress(body),
+                        headers={'Content-Encoding': 'gzip',
+                                 'Set-Cookie': 'session=1; Path=/'})
+        response = await self.session.get('http://example.com/api')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.reason, 'OK')
+        # Decompressed by the client itself.
+        self.assertEqual(await response.read(), body)
+        self.assertEqual(response.headers['Transfer-Encoding'], 'chunked')
+        cookies = self.session.cookie_jar.filter_cookies(
+            URL('http://example.com/')
+        )
+        self.assertEqual(cookies['session'].value, '1')
+
+    async def test_request_goes_through_the_client(self):
+        def callback(url, **kwargs):
+            return CallbackResult(body=kwargs['headers']['Content-Type']
+                                  + ' ' + kwargs['data'].decode())
+
+        self.mocked.post('http://example.com/api?a=1&b=2', callback=callback)
+        response = await self.session.post(
+            'http://example.com/api', params={'b': 2, 'a': 1},
+            json={'key': 'value'},
+        )
+        self.assertEqual(await response.text(),
+                         'application/json {"key": "value"}')
+        call, = self.mocked.requests[
+            ('POST', URL('http://example.com/api?a=1&b=2'))
+        ]
+        self.assertEqual(call.kwargs['headers']['Host'], 'example.com')
+
+    async def test_redirects_are_followed_by_the_client(self):
+        self.mocked.get('http://example.com/old', status=302,
+                        headers={'Location': '/new'})
+        self.mocked.get('http://example.com/new', body='moved')
+        response = await self.session.get('http://example.com/old')
+        self.assertEqual(await response.text(), 'moved')
+        self.assertEqual(len(response.history), 1)
+
+    async def test_streamed_body(self):
+        chunks = [b'x' * 100000 for _ in range(5)]
+        self.mocked.get('http://example.com/stream', body=iter(chunks))
+        response = await self.session.get('http://example.com/stream')
+        self.assertEqual(await response.read(), b''.join(chunks))
+
+    async def test_errors(self):
+        self.mocked.get('http://example.com/error',
+                        exception=ValueError('broken'))
+        with self.assertRaises(ValueError):
+            await self.session.get('http://example.com/error')
+        with self.assertRaises(ClientConnectionError):
+            await self.session.get('http://example.com/missing')
+
+    async def test_head(self):
+        self.mocked.head('http://example.com/api', body='ignored')
+        response = await self.session.head('http://example.com/api')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(await response.read(), b'')
+
+    async def test_connector_limit(self):
+        await self.session.close()
+        self.session = ClientSession(connector=self.mocked.connector(limit=1))
+        self.mocked.get('http://example.com/api', body='ok', repeat=True,
+                        latency=0.05)
+        started = self.loop.time()
+        responses = await asyncio.gather(*(
+            self.session.get('http://example.com/api') for _ in range(3)
+        ))
+        for response in responses:
+            self.assertEqual(await response.text(), 'ok')
+        self.assertGreaterEqual(self.loop.time() - started, 0.15)
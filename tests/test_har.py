@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import base64
+import io
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from aiohttp import ClientSession
+
+from aioresponses import aioresponses
+from aioresponses.har import HarContent, HarError, iter_entries, iter_routes
+from .base import AsyncTestCase
+
+
+def har_entry(method, url, status=200, text='', encoding=None,
+              headers=(), mime_type='application/json'):
+    content = {'size': len(text), 'mimeType': mime_type, 'text': text}
+    if encoding is not None:
+        content['encoding'] = encoding
+    return {
+        'startedDateTime': '2024-01-01T00:00:00.000Z',
+        'request': {'method': method, 'url': url, 'headers': []},
+        'response': {
+            'status': status,
+            'statusText': '',
+            'headers': [{'name': name, 'value': value}
+                        for name, value in headers],
+            'content': content,
+        },
+    }
+
+
+def har_document(entries):
+    return json.dumps({'log': {
+        'version': '1.2',
+        'creator': {'name': 'test', 'version': '1'},
+        'pages': [{'title': '"entries": ['}],
+        'entries': entries,
+    }}, indent=1)
+
+
+class HarParserTestCase(TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.har')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def test_entries_are_read_one_by_one(self):
+        entries = [
+            har_entry('GET', 'http://example.com/%d' % i, text='x' * i * 10)
+            for i in range(50)
+        ]
+        # Chunks much smaller than an entry force values across reads.
+        parsed = list(iter_entries(io.StringIO(har_document(entries)), 7))
+        self.assertEqual(parsed, entries)
+
+    def test_values_cut_off_by_any_chunk_size(self):
+        entries = [har_entry('GET', 'http://example.com/%d' % i, status=201)
+                   for i in range(3)]
+        document = json.dumps({'log': {
+            '_entryCount': 123456789,
+            'entries': entries,
+            '_total': -1.5e+10,
+            '_complete': True,
+        }})
+        for chunk_size in range(1, len(document) + 1):
+            parsed = list(iter_entries(io.StringIO(document), chunk_size))
+            self.assertEqual(parsed, entries, chunk_size)
+
+    def test_routes(self):
+        with open(self.path, 'w') as fp:
+            fp.write(har_document([
+                har_entry('GET', 'http://example.com/a', text='{}',
+                          headers=[('Content-Encoding', 'gzip'),
+                                   ('Content-Type', 'text/plain'),
+                                   ('Set-Cookie', 'a=1'),
+                                   ('Set-Cookie', 'b=2')]),
+                har_entry('GET', 'http://example.com/aborted', status=0),
+                har_entry('POST', 'http://example.com/b', status=201),
+            ]))
+        first, second = iter_routes(self.path)
+        self.assertEqual(first['url'], 'http://example.com/a')
+        self.assertEqual(first['content_type'], 'text/plain')
+        self.assertEqual(first['headers'].getall('Set-Cookie'),
+                         ['a=1', 'b=2'])
+        self.assertNotIn('Content-Encoding', first['headers'])
+        self.assertIsInstance(first['body'], HarContent)
+        self.assertEqual((second['method'], second['status']), ('POST', 201))
+
+    def test_content(self):
+        self.assertEqual(bytes(HarContent('zażółć')), 'zażółć'.encode())
+        encoded = base64.b64encode(b'\x00\xff').decode()
+        self.assertEqual(bytes(HarContent(encoded, 'base64')), b'\x00\xff')
+
+    def test_invalid_documents(self):
+        for document in ('', '[]', '{"log": {}}', '{"log": {"entries": [{}',
+                         '{"log": {"entries": [{"request": 1}]}}'):
+            with open(self.path, 'w') as fp:
+                fp.write(document)
+            with self.assertRaises(HarError, msg=document):
+                list(iter_routes(self.path))
+
+
+class HarImportTestCase(AsyncTestCase):
+
+    async def setup(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'capture.har')
+        self.session = ClientSession()
+
+    async def teardown(self):
+        await self.session.close()
+        self.directory.cleanup()
+
+    async def test_add_har(self):
+        image = bytes(range(256))
+        with open(self.path, 'w') as fp:
+            fp.write(har_document([
+                har_entry('GET', 'http://example.com/api?b=2&a=1',
+                          text='{"page": 1}'),
+                har_entry('GET', 'http://example.com/api?b=2&a=1',
+                          text='{"page": 2}'),
+                har_entry('GET', 'http://example.com/image.png',
+                          text=base64.b64encode(image).decode(),
+                          encoding='base64', mime_type='image/png'),
+                har_entry('GET', 'http://example.com/old', status=301,
+                          headers=[('Location', 'http://example.com/new')]),
+                har_entry('GET', 'http://example.com/new', text='moved'),
+            ]))
+        with aioresponses() as mocked:
+            mocked.add_har(self.path)
+            first = await self.session.get('http://example.com/api',
+                                           params={'a': 1, 'b': 2})
+            second = await self.session.get('http://example.com/api?a=1&b=2')
+            self.assertEqual(await first.json(), {'page': 1})
+            self.assertEqual(await second.json(), {'page': 2})
+            response = await self.session.get('http://example.com/image.png')
+            self.assertEqual(response.headers['Content-Type'], 'image/png')
+            self.assertEqual(await response.read(), image)
+            response = await self.session.get('http://example.com/old')
+            self.assertEqual(await response.text(), 'moved')
+
+    async def test_add_har_repeat(self):
+        with open(self.path, 'w') as fp:
+            fp.write(har_document([
+                har_entry('GET', 'http://example.com/api', text='[]'),
+            ]))
+        with aioresponses() as mocked:
+            mocked.add_har(self.path, repeat=True)
+            for _ in range(3):
+                response = await self.session.get('http://example.com/api')
+                self.assertEqual(await response.json(), [])
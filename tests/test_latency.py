@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from unittest import TestCase
+
+from aioresponses.latency import (
+    FixedLatency,
+    Latency,
+    LogNormalLatency,
+    NormalLatency,
+    PercentileLatency,
+    VirtualClock,
+    as_latency,
+)
+from .base import AsyncTestCase
+
+
+class LatencyTestCase(TestCase):
+
+    def test_as_latency(self):
+        self.assertIsNone(as_latency(None))
+        self.assertEqual(as_latency(0.5).sample(), 0.5)
+        latency = NormalLatency(0.1, 0.01)
+        self.assertIs(as_latency(latency), latency)
+        with self.assertRaises(ValueError):
+            FixedLatency(-1)
+
+    def test_custom_distribution(self):
+        class Incomplete(Latency):
+            pass
+
+        class Constant(Latency):
+            def sample(self):
+                return 0.25
+
+        for abstract in (Latency, Incomplete):
+            with self.assertRaises(TypeError):
+                abstract()
+        self.assertEqual(as_latency(Constant()).sample(), 0.25)
+
+    def test_seeded_distributions_are_reproducible(self):
+        for factory in (
+            lambda: NormalLatency(0.1, 0.05, seed=42),
+            lambda: LogNormalLatency(0.1, 0.5, seed=42),
+            lambda: PercentileLatency({50: 0.1, 99: 1.0}, seed=42),
+        ):
+            first, second = factory(), factory()
+            samples = [first.sample() for _ in range(100)]
+            self.assertEqual(samples, [second.sample() for _ in range(100)])
+            self.assertTrue(all(sample >= 0 for sample in samples))
+
+    def test_normal_latency_is_clipped(self):
+        latency = NormalLatency(0, 1, seed=1)
+        self.assertEqual(min(latency.sample() for _ in range(100)), 0)
+
+    def test_lognormal_latency_median(self):
+        latency = LogNormalLatency(0.2, 0.5, seed=1)
+        samples = sorted(latency.sample() for _ in range(10001))
+        self.assertAlmostEqual(samples[5000], 0.2, delta=0.01)
+
+    def test_percentile_latency(self):
+        latency = PercentileLatency({50: 0.1, 90: 0.5, 99: 2.0}, seed=1)
+        samples = sorted(latency.sample() for _ in range(10000))
+        self.assertEqual(samples[0], 0.1)
+        self.assertEqual(samples[-1], 2.0)
+        self.assertAlmostEqual(samples[7000], 0.3, delta=0.02)
+        with self.assertRaises(ValueError):
+            PercentileLatency({})
+        with self.assertRaises(ValueError):
+            PercentileLatency({101: 1.0})
+
+
+class VirtualClockTestCase(AsyncTestCase):
+
+    async def test_sleepers_wake_in_deadline_order(self):
+        clock = VirtualClock()
+        woken = []
+
+        async def sleeper(delay):
+            await clock.sleep(delay)
+            woken.append((delay, clock.time()))
+
+        await asyncio.gather(sleeper(3), sleeper(1), sleeper(2))
+        self.assertEqual(woken, [(1, 1), (2, 2), (3, 3)])
+
+    async def test_cancelled_sleeper_is_skipped(self):
+        clock = VirtualClock()
+        task = asyncio.ensure_future(clock.sleep(10))
+        await asyncio.sleep(0)
+        task.cancel()
+        await clock.sleep(1)
+        self.assertEqual(clock.time(), 1)
+
+    def test_advance(self):
+        clock = VirtualClock(5)
+        clock.advance(2.5)
+        self.assertEqual(clock.time(), 7.5)
+        with self.assertRaises(ValueError):
+            clock.advance(-1)
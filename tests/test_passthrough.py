@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import re
+from unittest import TestCase
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+
+from aioresponses import aioresponses
+from aioresponses.compat import URL
+from aioresponses.passthrough import PassthroughRules
+from .base import AsyncTestCase
+
+
+class PassthroughRulesTestCase(TestCase):
+
+    def test_prefixes(self):
+        rules = PassthroughRules([
+            'http://service-%d.internal:8080/' % i for i in range(500)
+        ] + ['http://backend', 'http://backend/api/v1'])
+        self.assertTrue(rules.match(URL('http://service-42.internal:8080/')))
+        self.assertTrue(rules.match(URL('http://backend/api/v2')))
+        self.assertTrue(rules.match(URL('http://backend-2/')))
+        self.assertFalse(rules.match(URL('http://service-42.internal/')))
+        self.assertFalse(rules.match(URL('http://example.com/')))
+
+    def test_patterns_and_hosts(self):
+        rules = PassthroughRules(
+            [re.compile(r'https?://[^/]+\.svc/')],
+            hosts=['Backend.Internal'],
+        )
+        self.assertTrue(rules.match(URL('https://users.svc/api')))
+        self.assertFalse(rules.match(URL('https://example.com/users.svc/')))
+        self.assertTrue(rules.match(URL('http://backend.internal:81/any')))
+        self.assertFalse(rules.match(URL('http://backend.internal.com/')))
+
+    def test_add_and_remove(self):
+        rules = PassthroughRules()
+        self.assertFalse(rules)
+        self.assertFalse(rules.match(URL('http://backend/')))
+        rules.add('http://backend')
+        rules.add('http://backend')
+        self.assertTrue(rules.match(URL('http://backend/')))
+        rules.remove('http://backend')
+        self.assertTrue(rules.match(URL('http://backend/')))
+        rules.remove('http://backend')
+        self.assertFalse(rules)
+        self.assertFalse(rules.match(URL('http://backend/')))
+        with self.assertRaises(ValueError):
+            rules.remove('http://backend')
+        # An empty prefix passes everything through.
+        rules.add('')
+        self.assertTrue(rules.match(URL('http://example.com/')))
+
+
+class PassthroughTestCase(AsyncTestCase):
+
+    async def setup(self):
+        app = web.Application()
+        app.router.add_get('/api', self.handler)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.url = str(self.server.make_url('/api'))
+        self.session = ClientSession()
+
+    async def teardown(self):
+        await self.session.close()
+        await self.server.close()
+
+    async def handler(self, request):
+        return web.Response(text='real')
+
+    async def test_passthrough_hosts(self):
+        with aioresponses(passthrough_hosts=[self.server.host]) as mocked:
+            mocked.get('http://example.com/api', body='mocked')
+            response = await self.session.get(self.url)
+            self.assertEqual(await response.text(), 'real')
+            response = await self.session.get('http://example.com/api')
+            self.assertEqual(await response.text(), 'mocked')
+
+    async def test_passthrough_patterns(self):
+        pattern = re.compile(r'http://[^/]+:%d/' % self.server.port)
+        with aioresponses(passthrough=[pattern]):
+            response = await self.session.get(self.url)
+            self.assertEqual(await response.text(), 'real')
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+pytest_plugins = ['pytester']
+
+CONFTEST = '''
+import asyncio
+import pytest
+from aiohttp import ClientSession
+
+
+@pytest.fixture(scope='session', autouse=True)
+def routes(aioresponses_shared):
+    aioresponses_shared.get('http://example.com/shared', status=201,
+                            repeat=True)
+
+
+@pytest.fixture
+def fetch():
+    async def _fetch(url):
+        async with ClientSession() as session:
+            response = await session.get(url)
+            return response.status
+
+    return lambda url: asyncio.run(_fetch(url))
+'''
+
+
+@pytest.fixture
+def plugin_pytester(pytester):
+    pytester.makeconftest(CONFTEST)
+    return pytester
+
+
+def test_overlay_falls_through_to_shared_mocks(plugin_pytester):
+    plugin_pytester.makepyfile('''
+        def test_overlay(aioresponses, fetch):
+            aioresponses.get('http://example.com/shared', status=202)
+            aioresponses.get('http://example.com/own', status=203)
+            assert fetch('http://example.com/shared') == 202
+            assert fetch('http://example.com/shared') == 201
+            assert fetch('http://example.com/own') == 203
+
+        def test_shared_only(aioresponses, fetch):
+            assert fetch('http://example.com/shared') == 201
+            # Calls served by the shared mocks are recorded per test too.
+            aioresponses.assert_called_once_with('http://example.com/shared')
+    ''')
+    result = plugin_pytester.runpytest('-p', 'aioresponses.pytest_plugin')
+    result.assert_outcomes(passed=2)
+
+
+def test_tests_without_the_fixture_are_not_mocked(plugin_pytester):
+    plugin_pytester.makepyfile('''
+        import asyncio
+        from aiohttp import ClientSession, web
+        from aiohttp.test_utils import TestServer
+
+        def test_mocked(aioresponses, fetch):
+            assert fetch('http://example.com/shared') == 201
+
+        def test_real_request():
+            async def handler(request):
+                return web.Response(status=204)
+
+            async def request():
+                app = web.Application()
+                app.router.add_get('/', handler)
+                async with TestServer(app) as server:
+                    async with ClientSession() as session:
+                        response = await session.get(server.make_url('/'))
+                        return response.status
+
+            assert asyncio.run(request()) == 204
+    ''')
+    result = plugin_pytester.runpytest('-p', 'aioresponses.pytest_plugin')
+    result.assert_outcomes(passed=2)
+
+
+def test_unconsumed_mocks_are_reported(plugin_pytester):
+    plugin_pytester.makepyfile('''
+        def test_unconsumed(aioresponses):
+            aioresponses.post('http://example.com/never')
+    ''')
+    result = plugin_pytester.runpytest('-p', 'aioresponses.pytest_plugin')
+    result.assert_outcomes(passed=1, warnings=1)
+    result.stdout.fnmatch_lines(
+        ['*Unconsumed mocked responses: POST http://example.com/never*']
+    )
+
+    plugin_pytester.makeini('''
+        [pytest]
+        aioresponses_unconsumed = fail
+    ''')
+    result = plugin_pytester.runpytest('-p', 'aioresponses.pytest_plugin')
+    result.assert_outcomes(passed=1, errors=1)
+
+
+def test_configurable_scope(plugin_pytester):
+    plugin_pytester.makeini('''
+        [pytest]
+        aioresponses_scope = module
+    ''')
+    plugin_pytester.makepyfile('''
+        def test_first(aioresponses, fetch):
+            aioresponses.get('http://example.com/module', status=204)
+
+        def test_second(aioresponses, fetch):
+            assert fetch('http://example.com/module') == 204
+    ''')
+    result = plugin_pytester.runpytest('-p', 'aioresponses.pytest_plugin')
+    result.assert_outcomes(passed=2)
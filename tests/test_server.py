@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import sys
+import urllib.error
+import urllib.request
+
+from aiohttp import ClientSession
+
+from aioresponses import CallbackResult, aioresponses
+from aioresponses.compat import URL
+from .base import AsyncTestCase
+
+FETCH_SCRIPT = '''
+import sys, urllib.request
+opener = urllib.request.build_opener(
+    urllib.request.ProxyHandler({'http': sys.argv[1]}))
+print(opener.open('http://example.com/api?b=2&a=1').read().decode())
+'''
+
+
+def fetch_through_proxy(proxy, url, data=None):
+    opener = urllib.request.build_opener(
+        urllib.request.ProxyHandler({'http': proxy})
+    )
+    try:
+        response = opener.open(url, data=data)
+    except urllib.error.HTTPError as error:
+        return error.code, error.read()
+    return response.status, response.read()
+
+
+class MockServerTestCase(AsyncTestCase):
+
+    async def setup(self):
+        self.session = ClientSession()
+
+    async def teardown(self):
+        await self.session.close()
+
+    def fetch(self, proxy, url, data=None):
+        return self.loop.run_in_executor(
+            None, fetch_through_proxy, str(proxy), url, data
+        )
+
+    async def test_host_header(self):
+        with aioresponses() as mocked:
+            mocked.get('http://example.com/api', payload={'served': True},
+                       headers={'X-Mocked': '1'})
+            async with mocked.serve() as server:
+                response = await self.session.get(
+                    server.url / 'api', headers={'Host': 'example.com'}
+                )
+                self.assertEqual(response.status, 200)
+                self.assertEqual(response.headers['X-Mocked'], '1')
+                self.assertEqual(await response.json(), {'served': True})
+            self.assertFalse(mocked._passthrough)
+
+    async def test_proxy_requests(self):
+        def callback(url, **kwargs):
+            return CallbackResult(
+                status=201, body=kwargs['data'] + b'!',
+                headers={'X-Agent': kwargs['headers']['User-Agent']},
+            )
+
+        with aioresponses() as mocked:
+            mocked.get('http://example.com/api?a=1&b=2', body='ok')
+            mocked.post('http://example.com/api', callback=callback)
+            async with mocked.serve() as server:
+                status, body = await self.fetch(
+                    server.url, 'http://example.com/api?b=2&a=1'
+                )
+                self.assertEqual((status, body), (200, b'ok'))
+                status, body = await self.fetch(
+                    server.url, 'http://example.com/api', b'data'
+                )
+                self.assertEqual((status, body), (201, b'data!'))
+        calls = mocked.requests[('POST', URL('http://example.com/api'))]
+        self.assertEqual(calls[0].kwargs['data'], b'data')
+        self.assertIn(('GET', URL('http://example.com/api?a=1&b=2')),
+                      mocked.requests)
+
+    async def test_unmatched_and_exceptions(self):
+        with aioresponses() as mocked:
+            mocked.get('http://example.com/error',
+                       exception=ValueError('broken'))
+            async with mocked.serve() as server:
+                status, body = await self.fetch(
+                    server.url, 'http://example.com/missing'
+                )
+                self.assertEqual(status, 502)
+                self.assertIn(b'GET http://example.com/missing', body)
+                status, body = await self.fetch(
+                    server.url, 'http://example.com/error'
+                )
+                self.assertEqual((status, body), (502, b'ValueError: broken'))
+
+    async def test_subprocess(self):
+        with aioresponses() as mocked:
+            mocked.get('http://example.com/api?a=1&b=2', body='shared')
+            async with mocked.serve() as server:
+                process = await asyncio.create_subprocess_exec(
+                    sys.executable, '-c', FETCH_SCRIPT, str(server.url),
+                    stdout=asyncio.subprocess.PIPE,
+                )
+                stdout, _ = await process.communicate()
+        self.assertEqual(stdout.strip(), b'shared')
+        self.assertEqual(len(mocked.requests), 1)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from unittest import TestCase
+
+from aioresponses.stats import RESERVOIR_SIZE, Timing, TimingSummary
+
+
+class TimingTestCase(TestCase):
+
+    def test_empty(self):
+        self.assertIsNone(Timing().summary())
+
+    def test_summary(self):
+        timing = Timing()
+        for duration in range(1, 101):
+            timing.add(duration)
+        self.assertEqual(
+            timing.summary(), TimingSummary(100, 5050, 1, 50.5, 99)
+        )
+
+    def test_percentile_over_reservoir(self):
+        timing = Timing()
+        for duration in range(RESERVOIR_SIZE * 10):
+            timing.add(duration)
+        summary = timing.summary()
+        self.assertEqual(summary.count, RESERVOIR_SIZE * 10)
+        self.assertEqual(summary.min, 0)
+        # A uniform sample puts the 99th percentile close to the real one.
+        self.assertAlmostEqual(
+            summary.p99 / (RESERVOIR_SIZE * 10), 0.99, delta=0.01
+        )
+
+    def test_merge(self):
+        timing = Timing()
+        timing.add(2)
+        other = Timing()
+        other.add(1)
+        other.add(3)
+        timing.merge(other)
+        self.assertEqual(timing.summary(), TimingSummary(3, 6, 1, 2, 3))
+
+    def test_merge_reservoirs(self):
+        timing = Timing()
+        other = Timing()
+        for duration in range(RESERVOIR_SIZE * 3):
+            timing.add(duration)
+            other.add(duration + RESERVOIR_SIZE * 3)
+        timing.merge(other)
+        summary = timing.summary()
+        self.assertEqual(summary.count, RESERVOIR_SIZE * 6)
+        self.assertEqual(summary.min, 0)
+        self.assertEqual(len(timing._samples), RESERVOIR_SIZE)
+        self.assertAlmostEqual(
+            summary.p99 / (RESERVOIR_SIZE * 6), 0.99, delta=0.01
+        )